@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+
+import openai
+from google.api_core import exceptions as google_exceptions
+
+# HTTP statuses worth retrying: timeouts, rate limiting and server-side errors.
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.TooManyRequests,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+# request_options for Gemini SDK calls made through a RateLimitedClient. The
+# SDK's own default retries would stack on the client's and bypass its
+# backoff and rate budget, so they are turned off.
+GEMINI_REQUEST_OPTIONS = {"retry": None}
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status in TRANSIENT_STATUS_CODES
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate_per_minute`. It
+    starts full, so up to one minute's allowance can be spent in a burst.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate_per_second = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        # A single request larger than the whole bucket would never fit; let it
+        # through once the bucket is full rather than blocking forever.
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+                self.updated_at = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate_per_second
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds. After that it is half-open: a single trial
+    call is let through while the others are still rejected. The breaker
+    closes if the trial succeeds and opens again for another
+    `reset_timeout` if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if self.trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures.")
+            self.trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+class RateLimitedClient:
+    """
+    Wraps calls to a remote API with request and token rate limits, a cap on
+    concurrent calls, jittered exponential retries on transient errors and
+    an optional circuit breaker. One instance is meant to be shared by every
+    thread calling the same model so the limits apply to all of them.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float | None = None, tokens_per_minute: float | None = None,
+                 max_concurrency: int = 4, max_retries: int = 5, base_delay: float = 2.0, max_delay: float = 60.0,
+                 circuit_breaker: CircuitBreaker | None = None):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.circuit_breaker = circuit_breaker
+
+    def call(self, fn, *args, tokens: int = 0, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_call()
+            if self.request_bucket is not None:
+                self.request_bucket.acquire()
+            if self.token_bucket is not None and tokens:
+                self.token_bucket.acquire(tokens)
+            try:
+                with self.semaphore:
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    # The API answered, so as far as the breaker is concerned
+                    # it is up; this also ends a half-open trial.
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_success()
+                    raise
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                print(f"{self.name} call failed with a transient error ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return result
@@ -0,0 +1,106 @@
+import re
+import subprocess
+from pathlib import Path
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+
+
+def probe_duration(audio_path: Path) -> float:
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(audio_path)],
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip())
+
+
+def detect_silences(audio_path: Path, noise_db: int = -35, min_silence: float = 0.5) -> list[tuple[float, float]]:
+    """
+    Returns (start, end) pairs, in seconds, of every stretch of audio quieter
+    than `noise_db` for at least `min_silence` seconds.
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-i", str(audio_path),
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-"],
+        capture_output=True, text=True, check=True,
+    )
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(duration: float, silences: list[tuple[float, float]], chunk_seconds: float,
+                search_window: float = 30.0) -> list[tuple[float, float]]:
+    """
+    Splits [0, duration) into consecutive (start, end) ranges of roughly
+    `chunk_seconds`. Each cut is moved back to the middle of the latest
+    silence within `search_window` seconds of the target, so words are not
+    cut in half; without a nearby silence the cut stays on the target.
+    """
+    midpoints = [(start + end) / 2 for start, end in silences]
+    chunks = []
+    start = 0.0
+    while duration - start > chunk_seconds:
+        target = start + chunk_seconds
+        candidates = [m for m in midpoints if target - search_window <= m <= target and m > start]
+        cut = max(candidates) if candidates else target
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, duration))
+    return chunks
+
+
+def export_chunk(audio_path: Path, start: float, end: float, out_path: Path) -> Path:
+    # 16 kHz mono is what Whisper resamples to anyway, and at 48 kbps an hour
+    # of audio stays well under the OpenAI upload limit.
+    subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+         "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", str(audio_path),
+         "-ac", "1", "-ar", "16000", "-b:a", "48k", str(out_path)],
+        check=True,
+    )
+    return out_path
+
+
+def _normalise(text: str) -> str:
+    return re.sub(r"\W+", " ", text).strip().lower()
+
+
+def merge_chunk_segments(chunks: list[tuple[float, float]], offsets: list[float], results: list[dict]) -> dict:
+    """
+    Stitches per-chunk transcription results back into one transcript.
+
+    `chunks` are the nominal (start, end) ranges from `plan_chunks`, `offsets`
+    the position in the original audio where each exported (overlapping)
+    chunk actually begins, and `results` the matching transcription results
+    with chunk-relative segment timestamps. A segment is kept only by the
+    chunk whose nominal range contains its start, which removes the overlap;
+    a repeated segment straddling a cut is dropped as well.
+    """
+    segments = []
+    for (start, end), offset, result in zip(chunks, offsets, results):
+        for segment in result["segments"]:
+            absolute_start = segment["start"] + offset
+            if not start <= absolute_start < end:
+                continue
+            text = segment["text"].strip()
+            if segments and _normalise(text) == _normalise(segments[-1]["text"]):
+                continue
+            segments.append({
+                "start": round(absolute_start, 3),
+                "end": round(segment["end"] + offset, 3),
+                "text": text,
+            })
+    return {
+        "text": " ".join(segment["text"] for segment in segments),
+        "segments": segments,
+    }
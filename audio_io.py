@@ -0,0 +1,44 @@
+import os
+import subprocess
+import wave
+from pathlib import Path
+import numpy as np
+
+# Whisper works on 16 kHz mono audio; anything else is resampled first.
+SAMPLE_RATE = 16000
+
+# Container extensions `download_audio` may leave in the audio cache, in
+# order of preference when more than one exists for a video.
+AUDIO_EXTENSIONS = (".wav", ".opus", ".webm", ".m4a", ".ogg", ".mp3")
+
+
+def decode_to_wav(source: str, out_path: Path, http_headers: dict | None = None) -> Path:
+    """
+    Decodes `source` (a local file or a remote stream URL) straight into a
+    16 kHz mono 16-bit WAV file with a single ffmpeg pass. The file is written
+    under a temporary name and renamed, so an interrupted decode never leaves
+    a truncated file behind in the cache.
+    """
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+    if http_headers:
+        command += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in http_headers.items())]
+    tmp_path = out_path.with_name(f"{out_path.stem}.part{out_path.suffix}")
+    command += ["-i", source, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-c:a", "pcm_s16le", str(tmp_path)]
+    subprocess.run(command, check=True)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def load_audio(audio_path: Path):
+    """
+    Returns what Whisper's `transcribe` should be given for `audio_path`: the
+    decoded samples for a WAV already at 16 kHz mono 16-bit, so Whisper does
+    not run ffmpeg again, or the path itself for any other file.
+    """
+    audio_path = Path(audio_path)
+    if audio_path.suffix == ".wav":
+        with wave.open(str(audio_path), "rb") as wav_file:
+            if (wav_file.getnchannels(), wav_file.getframerate(), wav_file.getsampwidth()) == (1, SAMPLE_RATE, 2):
+                frames = wav_file.readframes(wav_file.getnframes())
+                return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    return str(audio_path)
@@ -0,0 +1,347 @@
+"""
+Offline stand-ins for yt-dlp, Gemini, OpenAI, Firebase and the local
+transcriber, used by the pipeline benchmark. `install` puts the fake modules
+into `sys.modules` before `core` and `storage` are imported, so a benchmark
+run never touches the network and every run does exactly the same work.
+"""
+import base64
+import hashlib
+import random
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+# Words the fake transcriber and fake Gemini build their text from.
+_VOCABULARY = (
+    "the of and to a in is that it for on was with as be this are by at from have not or one had but what all were "
+    "when we there can an your which their said if do will each about how up out them then she many some so these "
+    "would other into has more her two like him see time could no make than first been its who now people my made"
+).split()
+
+
+def _seeded_text(seed: str, words: int) -> str:
+    rng = random.Random(hashlib.sha256(seed.encode("utf-8")).digest())
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(words))
+
+
+class Latency:
+    """A fixed delay with optional seeded jitter (a fraction of the delay)."""
+
+    def __init__(self, seconds: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.seconds = seconds
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.seconds <= 0:
+            return
+        with self._lock:
+            factor = 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+        time.sleep(self.seconds * factor)
+
+
+class Corpus:
+    """
+    A synthetic library: `channels` channels with `videos_per_channel`
+    videos each, newest first, all with the same duration and audio size.
+    """
+
+    def __init__(self, channels: int, videos_per_channel: int, duration: int = 600, audio_bytes: int = 256 * 1024):
+        self.channel_ids = [f"bench{c:04d}" for c in range(channels)]
+        self.videos_per_channel = videos_per_channel
+        self.duration = duration
+        self.audio_bytes = audio_bytes
+
+    def video_ids(self, channel_id: str) -> list[str]:
+        return [f"{channel_id}v{i:05d}" for i in range(self.videos_per_channel)]
+
+    def video_urls(self) -> list[str]:
+        return [f"https://www.youtube.com/watch?v={video_id}"
+                for channel_id in self.channel_ids for video_id in self.video_ids(channel_id)]
+
+    def video_info(self, video_id: str) -> dict:
+        day = sum(video_id.encode("utf-8")) % 28 + 1
+        return {
+            "id": video_id,
+            "title": f"Synthetic video {video_id}",
+            "uploader": video_id[:9],
+            "upload_date": f"202401{day:02d}",
+            "description": _seeded_text(video_id + ":description", 40),
+            "duration": self.duration,
+            "url": f"file:///dev/null#{video_id}",
+            "http_headers": {},
+            "ext": "opus",
+        }
+
+
+def make_yt_dlp_module(corpus: Corpus, latency: Latency) -> types.ModuleType:
+    class YoutubeDL:
+        def __init__(self, params=None):
+            self.params = params or {}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url: str, download: bool = False) -> dict:
+            latency.wait()
+            if url.endswith("/videos"):
+                channel_id = url.rsplit("/", 2)[-2].lstrip("@")
+                return {"entries": ({"id": video_id} for video_id in corpus.video_ids(channel_id))}
+            return corpus.video_info(url.split("v=", 1)[1])
+
+        def download(self, urls: list[str]):
+            outtmpl = self.params["outtmpl"]
+            # mp3 mode names the file without an extension and lets the
+            # FFmpegExtractAudio postprocessor add it; native mode keeps %(ext)s.
+            path = outtmpl.replace("%(ext)s", "opus") if "%(ext)s" in outtmpl else f"{outtmpl}.mp3"
+            for _ in urls:
+                latency.wait()
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(b"\0" * corpus.audio_bytes)
+            return 0
+
+    module = types.ModuleType("yt_dlp")
+    module.YoutubeDL = YoutubeDL
+    return module
+
+
+class FakeTranscriber:
+    """Stands in for a `TranscriptionBackend`: waits, then returns seeded text."""
+
+    name = "fake"
+
+    def __init__(self, latency: Latency, words: int = 1500, segment_words: int = 30):
+        self.latency = latency
+        self.words = words
+        self.segment_words = segment_words
+
+    def transcribe(self, audio_path: Path) -> dict:
+        self.latency.wait()
+        words = _seeded_text(Path(audio_path).name, self.words).split()
+        segments = [
+            {"start": float(i), "end": float(i + 1), "text": " ".join(words[i * self.segment_words:(i + 1) * self.segment_words])}
+            for i in range(-(-len(words) // self.segment_words))
+        ]
+        return {"text": " ".join(words), "segments": segments}
+
+    def close(self):
+        pass
+
+
+def make_genai_modules(latency: Latency, summary_words: int = 200) -> tuple[types.ModuleType, types.ModuleType]:
+    class GenerativeModel:
+        def __init__(self, model_name: str, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, **kwargs):
+            latency.wait()
+            return types.SimpleNamespace(text=_seeded_text(str(prompt), summary_words))
+
+        def count_tokens(self, text, **kwargs):
+            return types.SimpleNamespace(total_tokens=len(str(text)) // 4)
+
+    def embed_content(model: str, content: str, task_type: str = None, **kwargs):
+        latency.wait()
+        rng = random.Random(hashlib.sha256(content.encode("utf-8")).digest())
+        return {"embedding": [rng.uniform(-1, 1) for _ in range(64)]}
+
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = GenerativeModel
+    genai.embed_content = embed_content
+    genai_types = types.ModuleType("google.generativeai.types")
+    genai_types.HarmCategory = types.SimpleNamespace(
+        HARM_CATEGORY_HARASSMENT=1, HARM_CATEGORY_HATE_SPEECH=2,
+        HARM_CATEGORY_SEXUALLY_EXPLICIT=3, HARM_CATEGORY_DANGEROUS_CONTENT=4,
+    )
+    genai_types.HarmBlockThreshold = types.SimpleNamespace(BLOCK_NONE=0)
+    genai.types = genai_types
+    return genai, genai_types
+
+
+class NotFound(Exception):
+    pass
+
+
+class PreconditionFailed(Exception):
+    pass
+
+
+def make_exceptions_module(name: str, **known: type) -> types.ModuleType:
+    """
+    A module whose every attribute is an exception class, so code that names
+    the real library's error types (for retry rules, say) imports cleanly.
+    """
+    module = types.ModuleType(name)
+    module.__dict__.update(known)
+
+    def __getattr__(attr: str) -> type:
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        error = type(attr, (Exception,), {"__module__": name})
+        setattr(module, attr, error)
+        return error
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.generation = None
+        self.metageneration = None
+        self.metadata = None
+        self.cache_control = None
+
+    @property
+    def md5_hash(self) -> str | None:
+        stored = self.bucket.objects.get(self.name)
+        return base64.b64encode(hashlib.md5(stored[0]).digest()).decode("ascii") if stored else None
+
+    def _read(self, if_generation_match=None) -> bytes:
+        self.bucket.latency.wait()
+        with self.bucket.lock:
+            if self.name not in self.bucket.objects:
+                raise NotFound(self.name)
+            data, generation = self.bucket.objects[self.name]
+        if if_generation_match is not None and generation != if_generation_match:
+            raise PreconditionFailed(self.name)
+        return data
+
+    def _write(self, data: bytes, if_generation_match=None):
+        self.bucket.latency.wait()
+        with self.bucket.lock:
+            current = self.bucket.objects.get(self.name, (None, 0))[1]
+            if if_generation_match is not None and current != if_generation_match:
+                raise PreconditionFailed(self.name)
+            self.bucket.generation += 1
+            self.bucket.objects[self.name] = (data, self.bucket.generation)
+            self.bucket.custom_metadata[self.name] = (self.metadata, 1)
+            self.generation = self.bucket.generation
+            self.metageneration = 1
+
+    def exists(self) -> bool:
+        self.bucket.latency.wait()
+        with self.bucket.lock:
+            return self.name in self.bucket.objects
+
+    def reload(self):
+        self.bucket.latency.wait()
+        with self.bucket.lock:
+            if self.name not in self.bucket.objects:
+                raise NotFound(self.name)
+            self.generation = self.bucket.objects[self.name][1]
+            self.metadata, self.metageneration = self.bucket.custom_metadata[self.name]
+
+    def patch(self, if_metageneration_match=None):
+        self.bucket.latency.wait()
+        with self.bucket.lock:
+            if self.name not in self.bucket.objects:
+                raise NotFound(self.name)
+            current = self.bucket.custom_metadata[self.name][1]
+            if if_metageneration_match is not None and current != if_metageneration_match:
+                raise PreconditionFailed(self.name)
+            self.bucket.custom_metadata[self.name] = (self.metadata, current + 1)
+            self.metageneration = current + 1
+
+    def upload_from_filename(self, filename, content_type=None, if_generation_match=None):
+        self._write(Path(filename).read_bytes(), if_generation_match)
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None):
+        self._write(data.encode("utf-8") if isinstance(data, str) else data, if_generation_match)
+
+    def download_to_filename(self, filename):
+        Path(filename).write_bytes(self._read())
+
+    def download_as_bytes(self, if_generation_match=None) -> bytes:
+        return self._read(if_generation_match)
+
+    def delete(self, if_generation_match=None):
+        self.bucket.latency.wait()
+        with self.bucket.lock:
+            if self.name not in self.bucket.objects:
+                raise NotFound(self.name)
+            if if_generation_match is not None and self.bucket.objects[self.name][1] != if_generation_match:
+                raise PreconditionFailed(self.name)
+            del self.bucket.objects[self.name]
+            del self.bucket.custom_metadata[self.name]
+
+
+class FakeBucket:
+    """An in-memory bucket with a configurable round-trip latency per call."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.objects: dict[str, tuple[bytes, int]] = {}
+        self.custom_metadata: dict[str, tuple[dict | None, int]] = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix: str = "", fields=None) -> list[FakeBlob]:
+        self.latency.wait()
+        with self.lock:
+            blobs = [FakeBlob(self, name) for name in sorted(self.objects) if name.startswith(prefix)]
+            for blob in blobs:
+                blob.generation = self.objects[blob.name][1]
+                blob.metadata, blob.metageneration = self.custom_metadata[blob.name]
+            return blobs
+
+
+def make_firebase_modules(bucket: FakeBucket) -> dict[str, types.ModuleType]:
+    firebase_admin = types.ModuleType("firebase_admin")
+    firebase_admin._apps = {}
+    firebase_admin.initialize_app = lambda *args, **kwargs: firebase_admin._apps.setdefault("[DEFAULT]", object())
+    credentials = types.ModuleType("firebase_admin.credentials")
+    credentials.Certificate = lambda path: path
+    storage = types.ModuleType("firebase_admin.storage")
+    storage.bucket = lambda name=None: bucket
+    firestore = types.ModuleType("firebase_admin.firestore")
+    firestore.client = lambda: None
+    firebase_admin.credentials = credentials
+    firebase_admin.storage = storage
+    firebase_admin.firestore = firestore
+    return {
+        "firebase_admin": firebase_admin,
+        "firebase_admin.credentials": credentials,
+        "firebase_admin.storage": storage,
+        "firebase_admin.firestore": firestore,
+    }
+
+
+def install(corpus: Corpus, yt_dlp_latency: Latency, gemini_latency: Latency, bucket: FakeBucket):
+    """Registers every fake module. Must run before `core` or `storage` is imported."""
+    if "core" in sys.modules or "storage" in sys.modules:
+        raise RuntimeError("benchmarks.fakes.install must run before core and storage are imported")
+    genai, genai_types = make_genai_modules(gemini_latency)
+    exceptions = make_exceptions_module("google.api_core.exceptions", NotFound=NotFound, PreconditionFailed=PreconditionFailed)
+    api_core = types.ModuleType("google.api_core")
+    api_core.exceptions = exceptions
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType("google")
+        google.__path__ = []
+        sys.modules["google"] = google
+    google.generativeai = genai
+    google.api_core = api_core
+    sys.modules.update({
+        "yt_dlp": make_yt_dlp_module(corpus, yt_dlp_latency),
+        "google.generativeai": genai,
+        "google.generativeai.types": genai_types,
+        "google.api_core": api_core,
+        "google.api_core.exceptions": exceptions,
+        "openai": make_exceptions_module("openai"),
+        **make_firebase_modules(bucket),
+    })
@@ -0,0 +1,292 @@
+"""
+Offline end-to-end benchmark of `process_video`, `process_channels` and the
+pipelined channel mode.
+
+    python -m benchmarks.pipeline_bench --videos 1000 --channels 10 --mode channels --output after.json
+    python -m benchmarks.pipeline_bench --videos 1000 --channels 10 --mode channels --compare before.json
+
+yt-dlp, Gemini and the Firebase bucket are replaced by the fakes in
+`benchmarks/fakes.py`, and transcription by a fake backend, each with a
+fixed, configurable latency. A run therefore does the same work every time
+and measures only the code in this repository. Results include throughput,
+per-video and per-stage latency percentiles and peak RSS. `--compare`
+reports the change against an earlier result file made with the same
+parameters and exits non-zero on a regression beyond `--threshold`.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks import fakes  # noqa: E402
+
+PROMPT = ("Provide a one-paragraph summary and a list of key takeaways from the following transcript. "
+          "Please do this in the original language of the transcript.")
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile; None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize_latencies(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_storage(kind: str, write_behind: bool):
+    from storage import CompactStorage, FirebaseStorage, LocalStorage
+
+    if kind == "local":
+        return LocalStorage("data")
+    if kind == "compact":
+        return CompactStorage("data")
+    return FirebaseStorage(LocalStorage("data"), cred_path="bench-credentials.json", bucket_name="bench-bucket",
+                           write_behind=write_behind)
+
+
+def run(args) -> dict:
+    videos_per_channel = -(-args.videos // args.channels)
+    corpus = fakes.Corpus(args.channels, videos_per_channel, duration=args.video_seconds, audio_bytes=args.audio_kb * 1024)
+    bucket = fakes.FakeBucket(fakes.Latency(args.bucket_latency, args.jitter, args.seed))
+    fakes.install(corpus, fakes.Latency(args.yt_dlp_latency, args.jitter, args.seed + 1),
+                  fakes.Latency(args.gemini_latency, args.jitter, args.seed + 2), bucket)
+
+    import core
+    from cache_manager import CacheManagedStorage
+    from metrics import InstrumentedStorage, Metrics
+    from summary_cache import SummaryCache
+
+    class BenchMetrics(Metrics):
+        """Keeps every stage timing so percentiles can be reported, not just totals."""
+
+        def __init__(self):
+            super().__init__()
+            self.walls: dict[str, list[float]] = {}
+
+        def add(self, name: str, wall: float, ok: bool = True, **fields):
+            super().add(name, wall, ok=ok, **fields)
+            with self._lock:
+                self.walls.setdefault(name, []).append(wall)
+
+    transcriber = fakes.FakeTranscriber(fakes.Latency(args.transcribe_latency, args.jitter, args.seed + 3),
+                                        words=args.transcript_words)
+    core.create_backend = lambda *a, **kw: transcriber
+
+    metrics = BenchMetrics()
+    # Wrapped like main.py does, without budgets, so every storage mode runs
+    # through the cache manager's bookkeeping.
+    storage = CacheManagedStorage(InstrumentedStorage(build_storage(args.storage, args.write_behind), metrics), {})
+    summarizer = core.YouTubeSummarizer(
+        storage=storage,
+        gemini_api_key="bench",
+        transcription_mode="local",
+        summary_cache=SummaryCache("data/summary-cache"),
+        metrics=metrics,
+        audio_format="native",
+        discovery_workers=args.discovery_workers,
+    )
+
+    latencies = []
+    failures = 0
+    process_video = summarizer.process_video
+
+    def timed_process_video(url, prompt):
+        nonlocal failures
+        started = time.perf_counter()
+        try:
+            return process_video(url, prompt)
+        except Exception:
+            failures += 1
+            raise
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    summarizer.process_video = timed_process_video
+    total = len(corpus.video_urls())
+
+    output = sys.stdout if args.verbose else open(os.devnull, "w")
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        if args.mode == "video":
+            for url in corpus.video_urls():
+                try:
+                    summarizer.process_video(url, PROMPT)
+                except Exception:
+                    pass
+        elif args.mode == "channels":
+            summarizer.process_channels(corpus.channel_ids, videos_per_channel, PROMPT)
+        else:
+            results = summarizer.process_channels_pipelined(
+                corpus.channel_ids, videos_per_channel, PROMPT,
+                download_workers=args.download_workers,
+                transcribe_workers=args.transcribe_workers,
+                summarize_workers=args.summarize_workers,
+            )
+            failures = total - len(results)
+        summarizer.close()
+        storage.flush()
+    wall = time.perf_counter() - started
+
+    return {
+        "videos": total,
+        "failed": failures,
+        "wall_seconds": wall,
+        "throughput_videos_per_s": total / wall,
+        "latency": summarize_latencies(latencies) if latencies else None,
+        "stages": {name: {"total": sum(walls), **summarize_latencies(walls)} for name, walls in sorted(metrics.walls.items())},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# Headline figures compared by --compare: (path into the results, True if higher is better).
+_COMPARED = [
+    (("throughput_videos_per_s",), True),
+    (("latency", "p50"), False),
+    (("latency", "p95"), False),
+    (("latency", "p99"), False),
+    (("peak_rss_mb",), False),
+]
+
+
+def _lookup(results: dict, path: tuple) -> float | None:
+    for key in path:
+        if not isinstance(results, dict) or results.get(key) is None:
+            return None
+        results = results[key]
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> tuple[str, bool]:
+    lines = []
+    if baseline["params"] != current["params"]:
+        lines.append("Warning: the baseline was run with different parameters; the numbers are not comparable.")
+    lines.append(f"Comparing {current.get('commit') or 'working tree'} against baseline {baseline.get('commit') or '?'}")
+    lines.append(f"{'metric':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    paths = list(_COMPARED)
+    paths += [(("stages", name, "p95"), False) for name in sorted(current["results"]["stages"])
+              if name in baseline["results"]["stages"]]
+    regressed = False
+    for path, higher_is_better in paths:
+        before = _lookup(baseline["results"], path)
+        after = _lookup(current["results"], path)
+        if before is None or after is None or before == 0:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        lines.append(f"{'.'.join(path):<40}{before:>12.4f}{after:>12.4f}{change:>+10.1%}{flag}")
+    return "\n".join(lines), regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the summarizer with fake network services.")
+    parser.add_argument("--videos", type=int, default=100, help="Total videos in the synthetic corpus.")
+    parser.add_argument("--channels", type=int, default=1, help="Channels the videos are spread over.")
+    parser.add_argument("--mode", choices=["video", "channels", "pipeline"], default="video",
+                        help="Drive process_video per URL, process_channels, or process_channels_pipelined.")
+    parser.add_argument("--storage", choices=["local", "compact", "firebase"], default="local")
+    parser.add_argument("--write-behind", action="store_true", help="Use write-behind uploads with --storage firebase.")
+    parser.add_argument("--yt-dlp-latency", type=float, default=0.0, help="Seconds per fake yt-dlp request or download.")
+    parser.add_argument("--transcribe-latency", type=float, default=0.0, help="Seconds per fake transcription.")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="Seconds per fake Gemini call.")
+    parser.add_argument("--bucket-latency", type=float, default=0.0, help="Seconds per fake bucket call.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Seeded random jitter, as a fraction of each latency.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--video-seconds", type=int, default=600, help="Duration reported for every video.")
+    parser.add_argument("--audio-kb", type=int, default=256, help="Size of each fake audio file.")
+    parser.add_argument("--transcript-words", type=int, default=1500, help="Words in each fake transcript.")
+    parser.add_argument("--discovery-workers", type=int, default=8)
+    parser.add_argument("--download-workers", type=int, default=4)
+    parser.add_argument("--transcribe-workers", type=int, default=1)
+    parser.add_argument("--summarize-workers", type=int, default=4)
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=Path, help="Compare against an earlier results file.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression.")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary data directory.")
+    parser.add_argument("--verbose", action="store_true", help="Show the summarizer's own output.")
+    args = parser.parse_args()
+
+    params = {key: value for key, value in vars(args).items()
+              if key not in ("output", "compare", "threshold", "keep", "verbose")}
+    workdir = Path(tempfile.mkdtemp(prefix="yt-summarizer-bench-"))
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = run(args)
+    finally:
+        os.chdir(previous_cwd)
+        if args.keep:
+            print(f"Benchmark data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "benchmark": "pipeline_bench",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+    latency = results["latency"]
+    print(f"{results['videos']} videos ({results['failed']} failed) in {results['wall_seconds']:.2f}s: "
+          f"{results['throughput_videos_per_s']:.1f} videos/s, peak RSS {results['peak_rss_mb']:.0f} MB")
+    if latency:
+        print(f"Per-video latency: p50 {latency['p50'] * 1000:.1f} ms, p95 {latency['p95'] * 1000:.1f} ms, "
+              f"p99 {latency['p99'] * 1000:.1f} ms")
+    print(f"{'stage':<40}{'calls':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stage in sorted(results["stages"].items(), key=lambda item: -item[1]["total"]):
+        print(f"{name:<40}{stage['count']:>8}{stage['total']:>10.3f}{stage['p50'] * 1000:>10.2f}"
+              f"{stage['p95'] * 1000:>10.2f}{stage['p99'] * 1000:>10.2f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        text, regressed = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        print(text)
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
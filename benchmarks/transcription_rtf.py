@@ -0,0 +1,108 @@
+"""
+Compares local transcription backends on a fixed set of audio files.
+
+    python -m benchmarks.transcription_rtf samples/*.mp3 --backends whisper faster-whisper --models base small
+
+For every backend and model, each file is transcribed once and the real-time
+factor (wall seconds per second of audio; lower is faster) is reported. A
+file with a reference transcript next to it (`talk.mp3` -> `talk.txt`) also
+gets a word error rate, so the fastest engine that is still accurate enough
+can be picked. Keep the samples to a few minutes each: the WER alignment is
+quadratic in the transcript length.
+"""
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from audio_chunking import probe_duration
+from transcription import LOCAL_BACKENDS, create_backend
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+(?:'\w+)?", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def run_backend(backend_name: str, model_name: str, files: list[Path], durations: dict[Path, float]) -> dict:
+    started = time.perf_counter()
+    backend = create_backend(backend_name, model_name)
+    load_seconds = time.perf_counter() - started
+
+    results = []
+    for path in files:
+        started = time.perf_counter()
+        text = backend.transcribe(path)["text"]
+        wall = time.perf_counter() - started
+        reference_path = path.with_suffix(".txt")
+        wer = word_error_rate(reference_path.read_text(), text) if reference_path.exists() else None
+        results.append({"file": str(path), "audio_seconds": durations[path], "wall_seconds": wall,
+                        "rtf": wall / durations[path], "wer": wer})
+        print(f"  {backend_name}/{model_name} {path.name}: RTF {wall / durations[path]:.3f}"
+              + (f", WER {wer:.3f}" if wer is not None else ""))
+    backend.close()
+
+    audio_seconds = sum(r["audio_seconds"] for r in results)
+    wall_seconds = sum(r["wall_seconds"] for r in results)
+    wers = [r["wer"] for r in results if r["wer"] is not None]
+    return {
+        "backend": backend_name,
+        "model": model_name,
+        "load_seconds": load_seconds,
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall_seconds,
+        "rtf": wall_seconds / audio_seconds,
+        "wer": sum(wers) / len(wers) if wers else None,
+        "files": results,
+    }
+
+
+def format_table(runs: list[dict]) -> str:
+    header = f"{'backend':<16}{'model':<10}{'load s':>8}{'audio s':>10}{'wall s':>10}{'RTF':>8}{'x realtime':>12}{'WER':>8}"
+    lines = [header, "-" * len(header)]
+    for run in sorted(runs, key=lambda run: run["rtf"]):
+        wer = f"{run['wer']:.3f}" if run["wer"] is not None else "-"
+        lines.append(
+            f"{run['backend']:<16}{run['model']:<10}{run['load_seconds']:>8.1f}{run['audio_seconds']:>10.1f}"
+            f"{run['wall_seconds']:>10.1f}{run['rtf']:>8.3f}{1 / run['rtf']:>12.1f}{wer:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the real-time factor of local transcription backends.")
+    parser.add_argument("files", nargs="+", type=Path, help="Sample audio files.")
+    parser.add_argument("--backends", nargs="+", choices=LOCAL_BACKENDS, default=list(LOCAL_BACKENDS))
+    parser.add_argument("--models", nargs="+", default=["base"], help="Whisper model sizes to try.")
+    parser.add_argument("--json", type=Path, help="Also write the full results to this file.")
+    args = parser.parse_args()
+
+    durations = {path: probe_duration(path) for path in args.files}
+    runs = []
+    for backend_name in args.backends:
+        for model_name in args.models:
+            print(f"Benchmarking {backend_name} with model {model_name}...")
+            try:
+                runs.append(run_backend(backend_name, model_name, args.files, durations))
+            except ImportError as e:
+                print(f"  Skipped: {e}")
+
+    print(format_table(runs))
+    if args.json:
+        args.json.write_text(json.dumps(runs, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from storage_interface import StorageInterface, StorageWrapper
+
+# Artifact kinds managed by the cache, and the subdirectory of the storage's
+# base directory that holds each of them.
+CACHE_DIRS = {
+    "audio": "audio",
+    "transcripts": "transcripts",
+    "summaries": "summaries",
+    "metadata": "video-metadata",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (kind, last_access);
+"""
+
+
+def _video_id_of(path: Path) -> str:
+    return path.name.split(".", 1)[0]
+
+
+class CacheManager:
+    """
+    Bounds the disk used by the local cache. Every cached file is tracked in a
+    small SQLite index with its size and last access time. When an artifact
+    kind goes over its budget, or the cache as a whole goes over
+    `max_total_bytes`, the least recently used files that `can_evict` allows
+    are deleted. Audio is evicted first when freeing space for the total
+    budget.
+    """
+
+    def __init__(self, base_dir: Path, budgets: dict[str, int | None], max_total_bytes: int | None = None,
+                 can_evict=None, index_path: Path | None = None):
+        self.base_dir = Path(base_dir)
+        self.budgets = budgets
+        self.max_total_bytes = max_total_bytes
+        self.can_evict = can_evict or (lambda kind, path: True)
+        index_path = index_path or self.base_dir / "cache-index.sqlite3"
+        self._lock = threading.RLock()
+        # Held by the one thread running an eviction pass; others skip theirs.
+        self._enforce_lock = threading.Lock()
+        self._conn = sqlite3.connect(index_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._totals: dict[str, int] = {kind: 0 for kind in CACHE_DIRS}
+        self.scan()
+        self.enforce()
+
+    def scan(self):
+        """
+        Brings the index in line with the disk: files the index does not know
+        (for example from runs before it existed) are added with their
+        modification time as last access, and entries for deleted files are
+        dropped.
+        """
+        with self._lock, self._conn:
+            known = {path for (path,) in self._conn.execute("SELECT path FROM cache_entries")}
+            on_disk = set()
+            for kind, dirname in CACHE_DIRS.items():
+                for root, _, files in os.walk(self.base_dir / dirname):
+                    for name in files:
+                        path = os.path.join(root, name)
+                        on_disk.add(path)
+                        if path not in known:
+                            stat = os.stat(path)
+                            self._conn.execute(
+                                "INSERT INTO cache_entries (path, kind, size, last_access) VALUES (?, ?, ?, ?)",
+                                (path, kind, stat.st_size, stat.st_mtime),
+                            )
+            self._conn.executemany("DELETE FROM cache_entries WHERE path = ?", [(path,) for path in known - on_disk])
+            for kind, total in self._conn.execute("SELECT kind, SUM(size) FROM cache_entries GROUP BY kind"):
+                self._totals[kind] = total
+
+    def touch(self, kind: str, path: Path):
+        """
+        Records that `path` was just written or read. Budgets are enforced
+        only when this grows the cache, so reads and existence checks never
+        start an eviction pass.
+        """
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            # Not a file on disk: not written yet, or a CompactStorage row,
+            # whose path names a row under the database file.
+            return
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute("SELECT size FROM cache_entries WHERE path = ?", (str(path),)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (path, kind, size, last_access) VALUES (?, ?, ?, ?)",
+                    (str(path), kind, size, time.time()),
+                )
+            grown = size - (row[0] if row else 0)
+            self._totals[kind] += grown
+        if grown > 0:
+            self.enforce()
+
+    def _over_budget(self, kind: str) -> int:
+        budget = self.budgets.get(kind)
+        return self._totals[kind] - budget if budget is not None else 0
+
+    def _evict_lru(self, kind: str, bytes_to_free: int) -> int:
+        freed = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size FROM cache_entries WHERE kind = ? ORDER BY last_access", (kind,)
+            ).fetchall()
+        for path, size in rows:
+            if freed >= bytes_to_free:
+                break
+            # can_evict may ask the storage (or the bucket), so it runs
+            # without the lock that every tracked storage call takes.
+            if not self.can_evict(kind, Path(path)):
+                continue
+            with self._lock:
+                Path(path).unlink(missing_ok=True)
+                with self._conn:
+                    deleted = self._conn.execute("DELETE FROM cache_entries WHERE path = ?", (path,)).rowcount
+                if deleted:
+                    self._totals[kind] -= size
+                    freed += size
+        return freed
+
+    def enforce(self):
+        """
+        Evicts least recently used files until every budget is met or nothing
+        more can be evicted. If another thread is already evicting, returns
+        at once instead of waiting to repeat its scan.
+        """
+        if not self._enforce_lock.acquire(blocking=False):
+            return
+        try:
+            freed = 0
+            for kind in CACHE_DIRS:
+                if self._over_budget(kind) > 0:
+                    freed += self._evict_lru(kind, self._over_budget(kind))
+            if self.max_total_bytes is not None:
+                # Transcribed audio is the largest and least useful artifact,
+                # so it goes before any text.
+                for kind in CACHE_DIRS:
+                    excess = sum(self._totals.values()) - self.max_total_bytes
+                    if excess <= 0:
+                        break
+                    freed += self._evict_lru(kind, excess)
+            if freed:
+                print(f"Evicted {freed / 1e6:.1f} MB from the local cache.")
+        finally:
+            self._enforce_lock.release()
+
+    def usage(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._totals)
+
+    def close(self):
+        self._conn.close()
+
+
+# method name -> (cache kind, path getter) for the calls that write or read a cached file.
+_TRACKED = {
+    "audio_exists": ("audio", "get_audio_path"),
+    "transcript_exists": ("transcripts", "get_transcript_path"),
+    "save_transcript": ("transcripts", "get_transcript_path"),
+    "load_transcript": ("transcripts", "get_transcript_path"),
+    "save_transcript_segments": ("transcripts", "get_transcript_segments_path"),
+    "load_transcript_segments": ("transcripts", "get_transcript_segments_path"),
+    "summary_exists": ("summaries", "get_summary_path"),
+    "save_summary": ("summaries", "get_summary_path"),
+    "load_summary": ("summaries", "get_summary_path"),
+    "save_summary_html": ("summaries", "get_summary_html_path"),
+    "save_summary_config": ("summaries", "get_summary_config_path"),
+    "load_summary_config": ("summaries", "get_summary_config_path"),
+    "metadata_exists": ("metadata", "get_metadata_path"),
+    "save_metadata": ("metadata", "get_metadata_path"),
+    "load_metadata": ("metadata", "get_metadata_path"),
+}
+
+
+class CacheManagedStorage(StorageWrapper):
+    """
+    Wraps another storage and reports every cached file it writes or reads
+    to a `CacheManager`. Audio can be evicted once the video's transcript
+    exists, since it is never read again. Text can be evicted only when the
+    wrapped storage can fetch it back (`FirebaseStorage.is_synced`), in which
+    case the next load re-hydrates it from the bucket.
+    """
+
+    def __init__(self, storage: StorageInterface, budgets: dict[str, int | None], max_total_bytes: int | None = None):
+        super().__init__(storage)
+        # Eviction probes go to the innermost storage, so they are not counted
+        # as cache hits and misses by InstrumentedStorage.
+        self.probe_storage = storage
+        while isinstance(self.probe_storage, StorageWrapper):
+            self.probe_storage = self.probe_storage.storage
+        # FirebaseStorage keeps its files in the directories of its local cache.
+        base_dir = getattr(getattr(self.probe_storage, "local_storage", self.probe_storage), "base_dir", Path("data"))
+        self.cache = CacheManager(base_dir, budgets, max_total_bytes, self._can_evict)
+
+    def _can_evict(self, kind: str, path: Path) -> bool:
+        if kind == "audio":
+            return self.probe_storage.transcript_exists(_video_id_of(path))
+        is_synced = getattr(self.probe_storage, "is_synced", None)
+        return is_synced is not None and is_synced(path)
+
+    def _call(self, name: str, *args, **kwargs):
+        result = super()._call(name, *args, **kwargs)
+        if name in _TRACKED:
+            kind, path_getter = _TRACKED[name]
+            self.cache.touch(kind, getattr(self.storage, path_getter)(args[0]))
+        return result
+
+    def get_audio_path(self, video_id: str) -> Path:
+        path = self.storage.get_audio_path(video_id)
+        self.cache.touch("audio", path)
+        return path
@@ -1,99 +1,272 @@
 import os
 import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import yt_dlp
-import whisper
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 import openai
 from storage_interface import StorageInterface
 from html_generator import generate_summary_html
+from pipeline import VideoPipeline
+from summary_cache import SummaryCache
+from api_clients import GEMINI_REQUEST_OPTIONS, RateLimitedClient
+from discovery import ChannelDiscovery
+from metrics import Metrics
+from audio_io import AUDIO_EXTENSIONS, decode_to_wav
+from streaming import StreamingSummarizer
+from summarization import MAP_PROMPT, REDUCE_PROMPT, split_transcript
+from transcription import WhisperProcessPool, create_backend, result_to_dict
+from audio_chunking import detect_silences, export_chunk, merge_chunk_segments, plan_chunks, probe_duration
+
+# The OpenAI transcription endpoint rejects uploads larger than 25 MB.
+OPENAI_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+# Chunk length used when a cloud upload is too large but chunking is not configured.
+DEFAULT_CHUNK_SECONDS = 600
+
+def extract_video_id(youtube_url: str) -> str:
+    video_id_match = re.search(r"(?<=v=)[^&#]+", youtube_url)
+    if not video_id_match:
+        raise ValueError("Invalid YouTube URL")
+    return video_id_match.group(0)
 
 class YouTubeSummarizer:
-    def __init__(self, storage: StorageInterface, gemini_api_key: str, transcription_mode: str = 'local', openai_api_key: str = None):
+    def __init__(self, storage: StorageInterface, gemini_api_key: str, transcription_mode: str = 'local', openai_api_key: str = None,
+                 whisper_model_name: str = "base", whisper_workers: int = 1, local_backend: str = "whisper",
+                 chunk_seconds: int = 0, chunk_overlap_seconds: float = 2.0, chunk_workers: int = 4,
+                 gemini_model_name: str = "gemini-2.5-flash", summary_cache: SummaryCache | None = None,
+                 summary_token_budget: int = 100_000, summary_map_workers: int = 4,
+                 gemini_limiter: RateLimitedClient | None = None, openai_limiter: RateLimitedClient | None = None,
+                 discovery_workers: int = 8, metrics: Metrics | None = None, audio_format: str = 'mp3'):
+        if audio_format not in ('mp3', 'native', 'pcm'):
+            raise ValueError(f"Invalid audio format: {audio_format}")
         self.storage = storage
+        self.audio_format = audio_format
+        self.metrics = metrics or Metrics()
+        self.discovery = ChannelDiscovery(storage, max_workers=discovery_workers)
         self.transcription_mode = transcription_mode
+        self.whisper_pool = None
+        self.local_backend = None
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap_seconds = chunk_overlap_seconds
+        self.chunk_workers = chunk_workers
+
+        # Shared by every thread calling the APIs, so quotas hold across the whole run.
+        self.gemini_limiter = gemini_limiter or RateLimitedClient("Gemini")
+        self.openai_limiter = openai_limiter or RateLimitedClient("OpenAI")
 
         genai.configure(api_key=gemini_api_key)
-        self.genai_model = genai.GenerativeModel('gemini-2.5-flash')
+        self.gemini_model_name = gemini_model_name
+        self.genai_model = genai.GenerativeModel(gemini_model_name)
+        self.generation_config = {"max_output_tokens": 512000}
+        self.summary_cache = summary_cache or SummaryCache()
+        # Transcripts above this many tokens are summarized part by part and
+        # the partial summaries combined in a final call.
+        self.summary_token_budget = summary_token_budget
+        self.summary_map_workers = summary_map_workers
 
-        if self.transcription_mode == 'local':
-            self.whisper_model = whisper.load_model("base")
+        if self.transcription_mode == 'local' and whisper_workers > 1:
+            self.whisper_pool = WhisperProcessPool(whisper_model_name, whisper_workers, backend=local_backend)
+        elif self.transcription_mode == 'local':
+            self.local_backend = create_backend(local_backend, whisper_model_name)
         elif self.transcription_mode == 'cloud':
             if not openai_api_key:
                 raise ValueError("OpenAI API key is required for cloud transcription mode.")
-            self.openai_client = openai.OpenAI(api_key=openai_api_key)
+            # Retries are left to openai_limiter, which backs off within its budget.
+            self.openai_client = openai.OpenAI(api_key=openai_api_key, max_retries=0)
         else:
             raise ValueError(f"Invalid transcription mode: {self.transcription_mode}")
 
-    def get_video_id(self, youtube_url: str) -> str:
-        video_id_match = re.search(r"(?<=v=)[^&#]+", youtube_url)
-        if not video_id_match:
-            raise ValueError("Invalid YouTube URL")
-        return video_id_match.group(0)
+    def close(self):
+        if self.whisper_pool is not None:
+            self.whisper_pool.close()
+        if self.local_backend is not None:
+            self.local_backend.close()
 
-    def download_audio(self, youtube_url: str) -> Path:
-        video_id = self.get_video_id(youtube_url)
-        audio_path = self.storage.get_audio_path(video_id)
-        audio_path_without_ext = audio_path.with_suffix('')
+    def get_video_id(self, youtube_url: str) -> str:
+        return extract_video_id(youtube_url)
 
+    def _audio_download_options(self, audio_path_without_ext: Path, postprocessor_hook) -> dict:
         ydl_opts = {
             'format': 'bestaudio/best',
-            'postprocessors': [{
+            'postprocessor_hooks': [postprocessor_hook],
+            'quiet': True,
+        }
+        if self.audio_format == 'mp3':
+            ydl_opts['postprocessors'] = [{
                 'key': 'FFmpegExtractAudio',
                 'preferredcodec': 'mp3',
                 'preferredquality': '192',
-            }],
-            'outtmpl': str(audio_path_without_ext),
-            'quiet': True,
-        }
+            }]
+            ydl_opts['outtmpl'] = str(audio_path_without_ext)
+        else:
+            # Keep the stream exactly as YouTube serves it (usually opus in webm,
+            # or m4a); Whisper decodes it once when transcribing.
+            ydl_opts['outtmpl'] = f"{audio_path_without_ext}.%(ext)s"
+        return ydl_opts
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            if not self.storage.metadata_exists(video_id):
-                print(f"Downloading metadata for video {video_id}...")
-                info_dict = ydl.extract_info(youtube_url, download=False)
-                metadata = {
-                    'title': info_dict.get('title'),
-                    'uploader': info_dict.get('uploader'),
-                    'upload_date': info_dict.get('upload_date'),
-                    'description': info_dict.get('description'),
-                    'duration': info_dict.get('duration'),
-                }
-                self.storage.save_metadata(video_id, metadata)
-            else:
-                print(f"Metadata for video {video_id} found in cache.")
+    def download_audio(self, youtube_url: str) -> Path:
+        video_id = self.get_video_id(youtube_url)
+        audio_path = self.storage.get_audio_path(video_id)
 
-            if not self.storage.audio_exists(video_id):
-                print(f"Downloading audio for video {video_id}...")
-                ydl.download([youtube_url])
-            else:
-                print(f"Audio for video {video_id} found in cache.")
+        postprocessor_started = {}
+
+        def postprocessor_hook(d):
+            # Times yt-dlp's ffmpeg step separately from the network download.
+            if d['status'] == 'started':
+                postprocessor_started[d['postprocessor']] = time.perf_counter()
+            elif d['status'] == 'finished' and d['postprocessor'] in postprocessor_started:
+                wall = time.perf_counter() - postprocessor_started.pop(d['postprocessor'])
+                self.metrics.add(f"ffmpeg.{d['postprocessor']}", wall)
+
+        # Storages that shard audio create the shard directory only on write.
+        audio_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One runner per video downloads; the others wait and then find the
+        # metadata and audio in the cache. Audio is written in a temporary
+        # directory and renamed into place when complete, so an interrupted
+        # download never looks like a cached file.
+        with self.storage.lock(video_id, "download"), \
+                tempfile.TemporaryDirectory(prefix=f".{video_id}-", dir=audio_path.parent) as tmp_dir:
+            tmp_path_without_ext = Path(tmp_dir) / video_id
+            ydl_opts = self._audio_download_options(tmp_path_without_ext, postprocessor_hook)
+
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info_dict = None
+                if not self.storage.metadata_exists(video_id):
+                    print(f"Downloading metadata for video {video_id}...")
+                    with self.metrics.stage("yt_dlp.extract_info"):
+                        info_dict = ydl.extract_info(youtube_url, download=False)
+                    metadata = {
+                        'title': info_dict.get('title'),
+                        'uploader': info_dict.get('uploader'),
+                        'upload_date': info_dict.get('upload_date'),
+                        'description': info_dict.get('description'),
+                        'duration': info_dict.get('duration'),
+                    }
+                    self.storage.save_metadata(video_id, metadata)
+                else:
+                    print(f"Metadata for video {video_id} found in cache.")
+
+                if not self.storage.audio_exists(video_id):
+                    print(f"Downloading audio for video {video_id}...")
+                    with self.metrics.stage("download_audio") as record:
+                        if self.audio_format == 'pcm':
+                            if info_dict is None:
+                                info_dict = ydl.extract_info(youtube_url, download=False)
+                            # Decode the remote stream directly to 16 kHz mono PCM,
+                            # with no intermediate download or mp3 transcode.
+                            decode_to_wav(info_dict['url'], tmp_path_without_ext.with_suffix('.wav'), info_dict.get('http_headers'))
+                        else:
+                            ydl.download([youtube_url])
+                        downloaded = [path for path in Path(tmp_dir).iterdir() if path.suffix in AUDIO_EXTENSIONS]
+                        if not downloaded:
+                            # e.g. a native stream in a container such as .mp4 or .mka
+                            found = sorted(path.name for path in Path(tmp_dir).iterdir())
+                            raise RuntimeError(f"No audio file with a supported extension was downloaded for video {video_id}: {found}")
+                        for path in downloaded:
+                            os.replace(path, audio_path.parent / path.name)
+                        audio_path = self.storage.get_audio_path(video_id)
+                        record["bytes"] = audio_path.stat().st_size
+                else:
+                    print(f"Audio for video {video_id} found in cache.")
 
         return audio_path
 
+    def transcribe_file(self, audio_path: Path) -> dict:
+        if self.whisper_pool is not None:
+            return self.whisper_pool.transcribe(audio_path)
+        if self.transcription_mode == 'local':
+            return self.local_backend.transcribe(audio_path)
+        # cloud
+        with self.metrics.stage("openai.transcribe") as record:
+            record["bytes"] = audio_path.stat().st_size
+            return result_to_dict(self.openai_limiter.call(self._openai_transcribe, audio_path))
+
+    def _openai_transcribe(self, audio_path: Path):
+        # Opens the file per attempt so a retried upload starts from the beginning.
+        with open(audio_path, "rb") as audio_file:
+            return self.openai_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                response_format="verbose_json",
+                timestamp_granularities=["segment"],
+            )
+
+    def _should_chunk(self, audio_path: Path, duration: float) -> bool:
+        if self.chunk_seconds and duration > self.chunk_seconds:
+            return True
+        return self.transcription_mode == 'cloud' and audio_path.stat().st_size > OPENAI_MAX_UPLOAD_BYTES
+
+    def _transcribe_chunked(self, video_id: str, audio_path: Path, duration: float) -> dict:
+        chunk_seconds = self.chunk_seconds or DEFAULT_CHUNK_SECONDS
+        chunks = plan_chunks(duration, detect_silences(audio_path), chunk_seconds)
+        print(f"Transcribing video {video_id} in {len(chunks)} chunks...")
+
+        with tempfile.TemporaryDirectory(prefix=f"{video_id}-chunks-") as tmp_dir:
+            offsets = []
+            chunk_paths = []
+            for i, (start, end) in enumerate(chunks):
+                offset = max(0.0, start - self.chunk_overlap_seconds)
+                chunk_end = min(duration, end + self.chunk_overlap_seconds)
+                chunk_paths.append(export_chunk(audio_path, offset, chunk_end, Path(tmp_dir) / f"{i:04d}.mp3"))
+                offsets.append(offset)
+
+            if self.whisper_pool is not None:
+                futures = [self.whisper_pool.submit(path) for path in chunk_paths]
+                results = [future.result() for future in futures]
+            elif self.transcription_mode == 'cloud':
+                with ThreadPoolExecutor(max_workers=self.chunk_workers) as executor:
+                    results = list(executor.map(self.transcribe_file, chunk_paths))
+            else:
+                # A single local backend transcribes one file at a time, so
+                # threads would only queue on its lock.
+                results = [self.transcribe_file(path) for path in chunk_paths]
+
+        return merge_chunk_segments(chunks, offsets, results)
+
+    def download_audio_if_needed(self, youtube_url: str) -> Path:
+        # Re-summarizing with a new prompt only needs the transcript, not the audio.
+        video_id = self.get_video_id(youtube_url)
+        if self.storage.transcript_exists(video_id):
+            return self.storage.get_audio_path(video_id)
+        return self.download_audio(youtube_url)
+
+    def _metadata_duration(self, video_id: str) -> float:
+        if not self.storage.metadata_exists(video_id):
+            return 0.0
+        return float(self.storage.load_metadata(video_id).get('duration') or 0.0)
+
     def transcribe_audio(self, video_id: str, audio_path: Path) -> str:
         if self.storage.transcript_exists(video_id):
             print(f"Transcript for video {video_id} found in cache.")
             return self.storage.load_transcript(video_id)
 
-        print(f"Transcribing audio for video {video_id} using {self.transcription_mode} mode...")
-        if self.transcription_mode == 'local':
-            result = self.whisper_model.transcribe(str(audio_path))
-            transcript = result["text"]
-        else: # cloud
-            with open(audio_path, "rb") as audio_file:
-                result = self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file
-                )
-                transcript = result.text
+        with self.storage.lock(video_id, "transcribe"):
+            # Another runner may have written the transcript while we waited.
+            if self.storage.transcript_exists(video_id):
+                print(f"Transcript for video {video_id} was written by another runner.")
+                return self.storage.load_transcript(video_id)
 
-        self.storage.save_transcript(video_id, transcript)
-        return transcript
+            print(f"Transcribing audio for video {video_id} using {self.transcription_mode} mode...")
+            with self.metrics.stage("transcribe_audio") as record:
+                duration = probe_duration(audio_path) if self.chunk_seconds or self.transcription_mode == 'cloud' else 0.0
+                if self._should_chunk(audio_path, duration):
+                    result = self._transcribe_chunked(video_id, audio_path, duration)
+                else:
+                    result = self.transcribe_file(audio_path)
+                record["bytes"] = audio_path.stat().st_size
+                record["audio_seconds"] = duration or self._metadata_duration(video_id)
 
-    def summarize_transcript(self, video_id: str, transcript: str, prompt: str) -> str:
-        print(f"Generating summary for video {video_id}...")
-        full_prompt = f"{prompt}\n\n{transcript}"
+            transcript = result["text"]
+            self.storage.save_transcript(video_id, transcript)
+            if result["segments"]:
+                self.storage.save_transcript_segments(video_id, result["segments"])
+            return transcript
+
+    def _generate(self, full_prompt: str) -> str:
         safety_settings = {
             HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
             HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
@@ -101,56 +274,172 @@ class YouTubeSummarizer:
             HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
         }
 
-        generation_config = {"max_output_tokens": 512000}
+        response = None
         try:
-            response = self.genai_model.generate_content(full_prompt, safety_settings=safety_settings, generation_config=generation_config)
-            summary = response.text
+            with self.metrics.stage("gemini.generate_content") as record:
+                record["bytes"] = len(full_prompt.encode("utf-8"))
+                response = self.gemini_limiter.call(
+                    self.genai_model.generate_content,
+                    full_prompt,
+                    safety_settings=safety_settings,
+                    generation_config=self.generation_config,
+                    request_options=GEMINI_REQUEST_OPTIONS,
+                    tokens=len(full_prompt) // 4,
+                )
+            return response.text
         except Exception as e:
             print(f"An error occurred during Gemini API call: {e}")
             print("Full Gemini response:")
             print(response)
             raise
+
+    def has_current_summary(self, video_id: str, prompt: str) -> bool:
+        """
+        True when a summary exists and was generated with the current prompt,
+        model and generation config. The configuration is recorded in storage
+        next to the summary, so every runner sharing the storage sees it.
+        Summaries written before the summary cache existed carry no record of
+        their configuration and are kept as they are.
+        """
+        if not self.storage.summary_exists(video_id):
+            return False
+        # Records kept only in the local summary cache predate the storage ones.
+        recorded = self.storage.load_summary_config(video_id) or self.summary_cache.video_config(video_id)
+        return recorded is None or recorded == SummaryCache.config_key(prompt, self.gemini_model_name, self.generation_config)
+
+    def _count_tokens(self, text: str) -> int:
+        # Only ask the API when the rough four-characters-per-token estimate
+        # says the transcript might be near the budget.
+        estimate = len(text) // 4
+        if estimate < self.summary_token_budget // 2:
+            return estimate
+        try:
+            return self.gemini_limiter.call(self.genai_model.count_tokens, text,
+                                            request_options=GEMINI_REQUEST_OPTIONS).total_tokens
+        except Exception as e:
+            print(f"Could not count tokens, using estimate: {e}")
+            return estimate
+
+    def _summarize_chunk(self, chunk: str, map_prompt: str) -> str:
+        cache_key = SummaryCache.make_key(chunk, map_prompt, self.gemini_model_name, self.generation_config)
+        partial = self.summary_cache.get(cache_key)
+        if partial is None:
+            partial = self._generate(f"{map_prompt}\n\n{chunk}")
+            self.summary_cache.put(cache_key, partial)
+        return partial
+
+    def _summarize_map_reduce(self, video_id: str, transcript: str, prompt: str, total_tokens: int) -> str:
+        chars_per_token = len(transcript) / max(1, total_tokens)
+        chunks = split_transcript(transcript, int(self.summary_token_budget * chars_per_token))
+        print(f"Transcript for video {video_id} has ~{total_tokens} tokens, summarizing in {len(chunks)} parts...")
+
+        # Partial summaries go through the summary cache, so a failure in one
+        # part only costs that part on the next attempt.
+        map_prompts = [MAP_PROMPT.format(index=i + 1, total=len(chunks)) for i in range(len(chunks))]
+        with ThreadPoolExecutor(max_workers=self.summary_map_workers) as executor:
+            partials = list(executor.map(self._summarize_chunk, chunks, map_prompts))
+
+        combined = "\n\n".join(f"Part {i + 1}:\n{partial}" for i, partial in enumerate(partials))
+        return self._generate(f"{REDUCE_PROMPT.format(prompt=prompt)}\n\n{combined}")
+
+    def generate_summary(self, video_id: str, transcript: str, prompt: str) -> str:
+        """Returns the summary of `transcript` from the summary cache or Gemini, without saving it."""
+        cache_key = SummaryCache.make_key(transcript, prompt, self.gemini_model_name, self.generation_config)
+        summary = self.summary_cache.get(cache_key)
+        if summary is not None:
+            print(f"Summary for video {video_id} found in summary cache.")
+            self.metrics.count("cache.summary_cache.hit")
+        else:
+            print(f"Generating summary for video {video_id}...")
+            self.metrics.count("cache.summary_cache.miss")
+            with self.metrics.stage("summarize_transcript") as record:
+                record["bytes"] = len(transcript.encode("utf-8"))
+                total_tokens = self._count_tokens(transcript)
+                if total_tokens > self.summary_token_budget:
+                    summary = self._summarize_map_reduce(video_id, transcript, prompt, total_tokens)
+                else:
+                    summary = self._generate(f"{prompt}\n\n{transcript}")
+            self.summary_cache.put(cache_key, summary)
+        return summary
+
+    def summarize_transcript(self, video_id: str, transcript: str, prompt: str, publish: bool = True) -> str:
+        summary = self.generate_summary(video_id, transcript, prompt)
         self.storage.save_summary(video_id, summary)
-        
+        self.storage.save_summary_config(video_id, SummaryCache.config_key(prompt, self.gemini_model_name, self.generation_config))
+
+        if publish:
+            self.publish_summary(video_id, summary)
+        return summary
+
+    def summarize_if_needed(self, video_id: str, transcript: str, prompt: str, publish: bool = True) -> str:
+        """
+        `summarize_transcript` under the video's summarize lock, unless a
+        current summary already exists once the lock is held.
+        """
+        with self.storage.lock(video_id, "summarize"):
+            if self.has_current_summary(video_id, prompt):
+                print(f"Summary for video {video_id} was written by another runner.")
+                return self.storage.load_summary(video_id)
+            return self.summarize_transcript(video_id, transcript, prompt, publish=publish)
+
+    def publish_summary(self, video_id: str, summary: str):
         metadata = self.storage.load_metadata(video_id)
         html_content = generate_summary_html(video_id, summary, metadata)
         self.storage.save_summary_html(video_id, html_content)
-        
-        return summary
 
-    def get_channel_videos(self, channel_url: str, count: int) -> list[str]:
-        print(f"Fetching latest {count} videos from channel: {channel_url}")
-        ydl_opts = {
-            'extract_flat': True,
-            'quiet': True,
-            'playlistend': count,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            result = ydl.extract_info(f"{channel_url}/videos", download=False)
-            if 'entries' in result:
-                return [f"https://www.youtube.com/watch?v={entry['id']}" for entry in result['entries']]
-        return []
-
-    def process_channels(self, channel_ids: list[str], videos_per_channel: int, prompt: str):
-        for channel_id in channel_ids:
-            channel_url = f"https://www.youtube.com/@{channel_id}"
-            video_urls = self.get_channel_videos(channel_url, videos_per_channel)
-            for video_url in video_urls:
-                try:
-                    summary_path = self.process_video(video_url, prompt)
-                    print(f"Processed video: {video_url}")
-                    print(f"Summary saved to: {summary_path}")
-                except Exception as e:
-                    print(f"Failed to process video {video_url}: {e}")
+    def process_channels(self, channel_ids: list[str], videos_per_channel: int, prompt: str, since_last_seen: bool = False):
+        for channel_id, video_url in self.discovery.iter_channel_videos(channel_ids, videos_per_channel, since_last_seen):
+            try:
+                summary_path = self.process_video(video_url, prompt)
+                print(f"Processed video: {video_url}")
+                print(f"Summary saved to: {summary_path}")
+            except Exception as e:
+                print(f"Failed to process video {video_url}: {e}")
+                continue
+            self.discovery.mark_processed(channel_id, [self.get_video_id(video_url)])
+
+    def process_channels_pipelined(self, channel_ids: list[str], videos_per_channel: int, prompt: str,
+                                   download_workers: int = 4, transcribe_workers: int = 1, summarize_workers: int = 4,
+                                   since_last_seen: bool = False) -> dict[str, Path]:
+        if self.whisper_pool is not None:
+            # Stage threads only wait on the pool, so have at least one per process.
+            transcribe_workers = max(transcribe_workers, self.whisper_pool.workers)
+        pipeline = VideoPipeline(
+            self,
+            prompt,
+            download_workers=download_workers,
+            transcribe_workers=transcribe_workers,
+            summarize_workers=summarize_workers,
+        )
+        channel_of = {}
+
+        def video_urls():
+            for channel_id, video_url in self.discovery.iter_channel_videos(channel_ids, videos_per_channel, since_last_seen):
+                channel_of[video_url] = channel_id
+                yield video_url
+
+        results = pipeline.run(video_urls())
+        print(f"Pipeline finished: {len(results)} succeeded, {len(pipeline.errors)} failed.")
+        # Failed videos stay pending in the channel state and are listed again next run.
+        processed = {}
+        for video_url in results:
+            processed.setdefault(channel_of[video_url], []).append(self.get_video_id(video_url))
+        for channel_id, video_ids in processed.items():
+            self.discovery.mark_processed(channel_id, video_ids)
+        return results
+
+    def process_stream(self, youtube_url: str, prompt: str, window_seconds: float = 30.0, summary_interval: float = 300.0) -> Path:
+        streamer = StreamingSummarizer(self, window_seconds=window_seconds, summary_interval=summary_interval)
+        return streamer.run(youtube_url, prompt)
 
     def process_video(self, youtube_url: str, prompt: str) -> Path:
         video_id = self.get_video_id(youtube_url)
         
-        if self.storage.summary_exists(video_id):
+        if self.has_current_summary(video_id, prompt):
             print(f"Summary for video {video_id} found in cache.")
             return self.storage.get_summary_html_path(video_id)
 
-        audio_path = self.download_audio(youtube_url)
+        audio_path = self.download_audio_if_needed(youtube_url)
         transcript = self.transcribe_audio(video_id, audio_path)
-        summary = self.summarize_transcript(video_id, transcript, prompt)
+        summary = self.summarize_if_needed(video_id, transcript, prompt)
         return self.storage.get_summary_html_path(video_id)
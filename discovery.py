@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+import yt_dlp
+from storage_interface import StorageInterface
+
+# How many recently listed video ids to remember per channel. Keeping more
+# than one lets a listing stop correctly even if the newest known video was
+# deleted or made private since the last run.
+SEEN_IDS_TO_KEEP = 50
+
+
+class ChannelDiscovery:
+    """
+    Lists the latest videos of many channels concurrently. Each channel's
+    high-water mark (the ids it has already listed) is kept in storage, so
+    incremental listings return only videos posted since the last run and
+    stop paging as soon as they reach a known one.
+
+    Listed videos are also recorded as pending until the caller reports them
+    done with `mark_processed`, and incremental listings return them again
+    until then, so a video that fails is retried on the next run rather than
+    skipped for good.
+    """
+
+    def __init__(self, storage: StorageInterface, max_workers: int = 8):
+        self.storage = storage
+        self.max_workers = max_workers
+        # Channel state is read, modified and written back; serialize that.
+        self._state_lock = threading.Lock()
+
+    def _load_state(self, channel_id: str) -> dict:
+        if self.storage.channel_state_exists(channel_id):
+            return self.storage.load_channel_state(channel_id)
+        return {}
+
+    def list_videos(self, channel_id: str, count: int, since_last_seen: bool = False) -> list[str]:
+        with self._state_lock:
+            state = self._load_state(channel_id)
+        known_ids = set(state.get("seen_ids", [])) if since_last_seen else set()
+
+        channel_url = f"https://www.youtube.com/@{channel_id}"
+        print(f"Fetching latest {count} videos from channel: {channel_url}")
+        ydl_opts = {
+            'extract_flat': 'in_playlist',
+            # Fetch channel pages only as entries are consumed, so breaking out
+            # of the loop below stops further requests.
+            'lazy_playlist': True,
+            'quiet': True,
+            'playlistend': count,
+        }
+        new_entries = []
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            result = ydl.extract_info(f"{channel_url}/videos", download=False)
+            for entry in result.get('entries') or []:
+                if entry['id'] in known_ids:
+                    break
+                new_entries.append(entry)
+                if len(new_entries) >= count:
+                    break
+
+        video_ids = [entry['id'] for entry in new_entries]
+        with self._state_lock:
+            state = self._load_state(channel_id)
+            pending_ids = state.get("pending_ids", [])
+            if new_entries:
+                seen_ids = video_ids + [video_id for video_id in state.get("seen_ids", []) if video_id not in video_ids]
+                pending_ids = video_ids + [video_id for video_id in pending_ids if video_id not in video_ids]
+                self.storage.save_channel_state(channel_id, {
+                    "last_video_id": new_entries[0]['id'],
+                    "seen_ids": seen_ids[:SEEN_IDS_TO_KEEP],
+                    "pending_ids": pending_ids[:SEEN_IDS_TO_KEEP],
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                })
+        if since_last_seen:
+            retries = [video_id for video_id in pending_ids if video_id not in video_ids]
+            print(f"Found {len(new_entries)} new videos on channel {channel_id}"
+                  + (f", retrying {len(retries)} unfinished ones." if retries else "."))
+            video_ids += retries
+        return [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids]
+
+    def mark_processed(self, channel_id: str, video_ids: list[str]):
+        """
+        Records that `video_ids` were processed (or durably queued), so
+        incremental listings stop returning them.
+        """
+        with self._state_lock:
+            state = self._load_state(channel_id)
+            pending_ids = state.get("pending_ids", [])
+            remaining = [video_id for video_id in pending_ids if video_id not in set(video_ids)]
+            if remaining != pending_ids:
+                state["pending_ids"] = remaining
+                self.storage.save_channel_state(channel_id, state)
+
+    def iter_channel_videos(self, channel_ids: list[str], count: int, since_last_seen: bool = False):
+        """
+        Yields (channel_id, video_url) pairs from all channels as each
+        channel's listing completes. A channel that fails to list is
+        reported and skipped.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="discovery") as executor:
+            futures = {
+                executor.submit(self.list_videos, channel_id, count, since_last_seen): channel_id
+                for channel_id in channel_ids
+            }
+            for future in as_completed(futures):
+                channel_id = futures[future]
+                try:
+                    video_urls = future.result()
+                except Exception as e:
+                    print(f"Failed to list videos for channel {channel_id}: {e}")
+                    continue
+                for video_url in video_urls:
+                    yield channel_id, video_url
@@ -2,65 +2,175 @@ const {onRequest} = require("firebase-functions/v2/https");
 const logger = require("firebase-functions/logger");
 const admin = require("firebase-admin");
 const cors = require("cors")({origin: true});
+const crypto = require("crypto");
 
 admin.initializeApp();
 
-exports.getSummaries = onRequest((req, res) => {
-  cors(req, res, async () => {
-    try {
-      const bucket = admin.storage().bucket();
-      const [files] = await bucket.getFiles({prefix: "video-metadata/"});
-      const metadatas = [];
+// Paginated list of summaries precomputed by the Python side (see
+// summary_index.py), so a page load reads one object whatever the library size.
+const INDEX_PREFIX = "summary-index/";
+const ENTRIES_FILE = INDEX_PREFIX + "entries.json";
+const PAGE_SIZE = 50;
+const PAGE_CACHE_CONTROL = "public, max-age=60, s-maxage=300";
+// Custom metadata key holding the entries.json generation a page was built
+// from; a page built from a newer generation is never replaced.
+const PAGE_GENERATION_KEY = "entries-generation";
 
-      logger.info(`Found ${files.length} files in video-metadata/`);
+/**
+ * Splits the unarchived index entries into pages, newest upload first.
+ * Must produce the same pages as build_pages in summary_index.py.
+ * @param {object} state The parsed entries.json document.
+ * @return {object[]} The pages, at least one.
+ */
+function buildPages(state) {
+  const archived = new Set(state.archived || []);
+  const videos = Object.values(state.entries || {})
+      .filter((entry) => !archived.has(entry.id));
+  videos.sort((a, b) => {
+    const keyA = [a.upload_date || "", a.id];
+    const keyB = [b.upload_date || "", b.id];
+    if (keyA[0] !== keyB[0]) return keyA[0] < keyB[0] ? 1 : -1;
+    return keyA[1] < keyB[1] ? 1 : keyA[1] > keyB[1] ? -1 : 0;
+  });
+  const totalPages = Math.max(1, Math.ceil(videos.length / PAGE_SIZE));
+  const pages = [];
+  for (let number = 0; number < totalPages; number++) {
+    pages.push({
+      page: number + 1,
+      pages: totalPages,
+      total: videos.length,
+      videos: videos.slice(number * PAGE_SIZE, (number + 1) * PAGE_SIZE),
+    });
+  }
+  return pages;
+}
 
-      const db = admin.firestore();
-      const videoPropertiesCollection = db.collection("video_properties");
-
-      const promises = files.map(async (file) => {
-        if (file.name.endsWith(".json")) {
-          const videoId = file.name.split("/").pop().replace(".json", "");
-          const doc = await videoPropertiesCollection.doc(videoId).get();
-
-          if (doc.exists && doc.data().is_archived) {
-            return;
-          }
-
-          const stream = file.createReadStream();
-          let buffer = "";
-          await new Promise((resolve, reject) => {
-            stream.on("data", (chunk) => {
-              buffer += chunk.toString();
-            });
-            stream.on("end", () => {
-              try {
-                const metadata = JSON.parse(buffer);
-                metadata.id = videoId;
-                metadatas.push(metadata);
-                resolve();
-              } catch (e) {
-                logger.error(`Error parsing JSON from ${file.name}`, e);
-                reject(e);
-              }
-            });
-            stream.on("error", (err) => {
-              logger.error(`Error reading file ${file.name}`, err);
-              reject(err);
-            });
+/**
+ * Returns the entries generation recorded on a page file.
+ * @param {object} file A page file with its metadata loaded.
+ * @return {number} The generation, or 0 for a page written without one.
+ */
+function pageGeneration(file) {
+  return Number((file.metadata.metadata || {})[PAGE_GENERATION_KEY] || 0);
+}
+
+/**
+ * Writes the pages of `state` that changed, unless a page was already
+ * written from a newer generation. Mirrors SummaryIndex._write_pages.
+ * @param {object} bucket The storage bucket.
+ * @param {object} state The parsed entries.json document.
+ * @param {number} generation The generation `state` was saved as.
+ */
+async function writePages(bucket, state, generation) {
+  const label = {[PAGE_GENERATION_KEY]: String(generation)};
+  for (let attempt = 0; attempt < 10; attempt++) {
+    const [pageFiles] = await bucket.getFiles({prefix: INDEX_PREFIX + "page-"});
+    const existing = new Map(pageFiles.map((file) => [file.name, file]));
+    const pages = buildPages(state);
+    try {
+      await Promise.all(pages.map(async (page) => {
+        const name = `${INDEX_PREFIX}page-${page.page}.json`;
+        const body = JSON.stringify(page);
+        const current = existing.get(name);
+        existing.delete(name);
+        if (current && pageGeneration(current) >= generation) return;
+        const md5 = crypto.createHash("md5").update(body).digest("base64");
+        if (current && current.metadata.md5Hash === md5) {
+          await current.setMetadata({metadata: label}, {
+            ifMetagenerationMatch: current.metadata.metageneration,
           });
+          return;
         }
+        await bucket.file(name).save(body, {
+          contentType: "application/json",
+          metadata: {cacheControl: PAGE_CACHE_CONTROL, metadata: label},
+          preconditionOpts: {
+            ifGenerationMatch: current ? current.metadata.generation : 0,
+          },
+        });
+      }));
+      // Pages past the end left over from a longer list.
+      await Promise.all([...existing.values()]
+          .filter((file) => pageGeneration(file) < generation)
+          .map((file) => file.delete({ifGenerationMatch: file.metadata.generation})));
+      return;
+    } catch (error) {
+      // Another writer changed a page since the listing; list again.
+      if (error.code === 412 || error.code === 404) continue;
+      throw error;
+    }
+  }
+  throw new Error(`Could not write the ${INDEX_PREFIX} pages`);
+}
+
+/**
+ * Marks a video archived or not in the index and rewrites the pages. The
+ * read-modify-write is guarded by the entries file's generation so it never
+ * loses an update made concurrently by a summarizer run.
+ * @param {object} bucket The storage bucket.
+ * @param {string} videoId The video to change.
+ * @param {boolean} isArchived Whether the video is now archived.
+ */
+async function setArchivedInIndex(bucket, videoId, isArchived) {
+  const entriesFile = bucket.file(ENTRIES_FILE);
+  for (let attempt = 0; attempt < 10; attempt++) {
+    let state = {entries: {}, archived: []};
+    let generation = 0;
+    const [exists] = await entriesFile.exists();
+    if (exists) {
+      const [metadata] = await entriesFile.getMetadata();
+      generation = metadata.generation;
+      const [contents] = await entriesFile.download();
+      state = JSON.parse(contents.toString());
+    }
+    const archived = new Set(state.archived || []);
+    if (isArchived) {
+      archived.add(videoId);
+    } else {
+      archived.delete(videoId);
+    }
+    state.archived = [...archived].sort();
+    try {
+      await entriesFile.save(JSON.stringify(state), {
+        contentType: "application/json",
+        preconditionOpts: {ifGenerationMatch: generation},
       });
+    } catch (error) {
+      if (error.code === 412) continue;
+      throw error;
+    }
+    await writePages(bucket, state, Number(entriesFile.metadata.generation));
+    return;
+  }
+  throw new Error(`Could not update ${ENTRIES_FILE}`);
+}
 
-      await Promise.all(promises);
+exports.getSummaries = onRequest((req, res) => {
+  cors(req, res, async () => {
+    try {
+      const page = parseInt(req.query.page || "1", 10);
+      if (!(page >= 1)) {
+        res.status(400).send("Invalid page parameter");
+        return;
+      }
 
-      metadatas.sort((a, b) => {
-        //const dateA = new Date(a.upload_date);
-        //const dateB = new Date(b.upload_date);
-        return b - a;
-      });
+      const bucket = admin.storage().bucket();
+      const pageFile = bucket.file(`${INDEX_PREFIX}page-${page}.json`);
+      const [exists] = await pageFile.exists();
+      if (!exists) {
+        if (page === 1) {
+          res.set("Cache-Control", PAGE_CACHE_CONTROL);
+          res.status(200).json({page: 1, pages: 1, total: 0, videos: []});
+        } else {
+          res.status(404).send("Page not found");
+        }
+        return;
+      }
 
-      logger.info(`Successfully processed ${metadatas.length} metadata files.`);
-      res.status(200).json(metadatas);
+      const [contents] = await pageFile.download();
+      res.set("Cache-Control", PAGE_CACHE_CONTROL);
+      res.set("Content-Type", "application/json");
+      res.status(200).send(contents);
     } catch (error) {
       logger.error("Error getting summaries:", error);
       res.status(500).send("Internal Server Error");
@@ -142,6 +252,7 @@ exports.modifyVideo = onRequest((req, res) => {
       await videoPropertiesRef.set({
         is_archived: isArchived,
       }, { merge: true });
+      await setArchivedInIndex(admin.storage().bucket(), videoId, isArchived);
 
       res.status(200).send(`Video ${videoId} has been ${action}d.`);
     } catch (error) {
@@ -10,53 +10,78 @@ document.addEventListener("DOMContentLoaded", () => {
         return `${h}:${m}:${s}`;
     };
 
-    fetch(functionUrl)
-        .then(response => response.json())
-        .then(data => {
-            loader.style.display = "none";
-            videoList.style.display = "block";
-
-            if (data.length === 0) {
-                videoList.innerHTML = "<p>No summaries found.</p>";
-                return;
-            }
-
-            data.forEach(video => {
-                const link = document.createElement("a");
-                link.href = `video.html?video_id=${video.id}`;
-                link.className = "video-link";
-
-                const videoItem = document.createElement("div");
-                videoItem.className = "video-item";
-
-                const title = document.createElement("h2");
-                title.textContent = video.title;
-
-                const channel = document.createElement("p");
-                channel.textContent = `Channel: ${video.uploader}`;
-
-                const uploadDate = document.createElement("p");
-                const dateStr = video.upload_date;
-                const year = dateStr.substring(0, 4);
-                const month = dateStr.substring(4, 6);
-                const day = dateStr.substring(6, 8);
-                uploadDate.textContent = `Uploaded: ${new Date(year, month - 1, day).toLocaleDateString()}`;
-
-                const duration = document.createElement("p");
-                duration.textContent = `Duration: ${formatDuration(video.duration)}`;
-
-                videoItem.appendChild(title);
-                videoItem.appendChild(channel);
-                videoItem.appendChild(uploadDate);
-                videoItem.appendChild(duration);
-
-                link.appendChild(videoItem);
-                videoList.appendChild(link);
+    const loadMoreButton = document.createElement("button");
+    loadMoreButton.id = "load-more";
+    loadMoreButton.textContent = "Load more";
+    loadMoreButton.style.display = "none";
+
+    const renderVideo = (video) => {
+        const link = document.createElement("a");
+        // video.html works for every indexed video and shows the page
+        // pre-rendered by --build-site once that has been deployed.
+        link.href = `video.html?video_id=${encodeURIComponent(video.id)}`;
+        link.className = "video-link";
+
+        const videoItem = document.createElement("div");
+        videoItem.className = "video-item";
+
+        const title = document.createElement("h2");
+        title.textContent = video.title;
+
+        const channel = document.createElement("p");
+        channel.textContent = `Channel: ${video.uploader}`;
+
+        const uploadDate = document.createElement("p");
+        const dateStr = video.upload_date || "";
+        const year = dateStr.substring(0, 4);
+        const month = dateStr.substring(4, 6);
+        const day = dateStr.substring(6, 8);
+        uploadDate.textContent = `Uploaded: ${new Date(year, month - 1, day).toLocaleDateString()}`;
+
+        const duration = document.createElement("p");
+        duration.textContent = `Duration: ${formatDuration(video.duration)}`;
+
+        videoItem.appendChild(title);
+        videoItem.appendChild(channel);
+        videoItem.appendChild(uploadDate);
+        videoItem.appendChild(duration);
+
+        link.appendChild(videoItem);
+        videoList.appendChild(link);
+    };
+
+    // The index is served one precomputed page at a time, newest first.
+    const loadPage = (page) => {
+        loadMoreButton.disabled = true;
+        return fetch(`${functionUrl}?page=${page}`)
+            .then(response => response.json())
+            .then(data => {
+                loader.style.display = "none";
+                videoList.style.display = "block";
+
+                if (data.total === 0) {
+                    videoList.innerHTML = "<p>No summaries found.</p>";
+                    return;
+                }
+
+                data.videos.forEach(renderVideo);
+
+                loadMoreButton.disabled = false;
+                if (data.page < data.pages) {
+                    loadMoreButton.onclick = () => loadPage(data.page + 1);
+                    videoList.after(loadMoreButton);
+                    loadMoreButton.style.display = "block";
+                } else {
+                    loadMoreButton.style.display = "none";
+                }
+            })
+            .catch(error => {
+                console.error("Error fetching summaries:", error);
+                loader.style.display = "none";
+                loadMoreButton.disabled = false;
+                videoList.innerHTML += "<p>Error loading summaries. Please try again later.</p>";
             });
-        })
-        .catch(error => {
-            console.error("Error fetching summaries:", error);
-            loader.style.display = "none";
-            videoList.innerHTML = "<p>Error loading summaries. Please try again later.</p>";
-        });
+    };
+
+    loadPage(1);
 });
@@ -54,7 +54,22 @@ document.addEventListener("DOMContentLoaded", () => {
             }
 
             videoDetails.innerHTML = metadataHtml;
-            videoDetails.innerHTML += marked.parse(summary);
+            // The summary comes pre-rendered from the static page built by
+            // --build-site; until that exists, show the markdown as text.
+            const summaryElement = document.createElement("div");
+            summaryElement.textContent = summary;
+            summaryElement.style.whiteSpace = "pre-wrap";
+            videoDetails.appendChild(summaryElement);
+            fetch(`summaries/${encodeURIComponent(videoId)}.html`)
+                .then(response => response.ok ? response.text() : Promise.reject(response.status))
+                .then(page => {
+                    const rendered = new DOMParser().parseFromString(page, "text/html").getElementById("summary");
+                    if (rendered) {
+                        summaryElement.style.whiteSpace = "";
+                        summaryElement.innerHTML = rendered.innerHTML;
+                    }
+                })
+                .catch(() => {});
 
             let current_is_archived = is_archived;
             const archiveButton = document.createElement("button");
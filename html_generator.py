@@ -1,80 +1,158 @@
-def generate_summary_html(video_id: str, summary_md: str, metadata: dict) -> str:
+import html
+import re
+from urllib.parse import urlsplit
+import markdown
+from markdown.treeprocessors import Treeprocessor
+
+# File name of the stylesheet shared by the site's summary pages. Site pages
+# link it instead of inlining it, so a browser fetches it once for the whole
+# site; the copies kept in storage inline it so they render on their own.
+STYLESHEET_NAME = "summary.css"
+
+# Bump when the page template changes so the site builder regenerates every page.
+TEMPLATE_VERSION = 3
+
+# Link and image URL schemes kept in rendered summaries; URLs without a
+# scheme (relative links and #fragments) are kept too.
+SAFE_URL_SCHEMES = ("http", "https", "mailto")
+
+SUMMARY_CSS = """\
+body {
+    font-family: 'Arial', sans-serif;
+    line-height: 1.6;
+    color: #333;
+    margin: 0;
+    padding: 20px;
+    background-color: #f4f4f4;
+}
+#content {
+    max-width: 800px;
+    margin: 20px auto;
+    padding: 30px;
+    background-color: #fff;
+    border-radius: 8px;
+    box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+}
+h1, h2, h3, h4, h5, h6 {
+    color: #0056b3;
+}
+pre {
+    background-color: #eee;
+    padding: 10px;
+    border-radius: 5px;
+    overflow-x: auto;
+}
+code {
+    font-family: 'Courier New', Courier, monospace;
+    background-color: #eee;
+    padding: 2px 4px;
+    border-radius: 3px;
+}
+@media (max-width: 600px) {
+    body {
+        padding: 0;
+    }
+    #content {
+        margin: 0;
+        padding: 15px;
+        border-radius: 0;
+    }
+}
+"""
+
+
+def is_safe_url(url: str) -> bool:
+    # Browsers ignore whitespace and control characters inside a scheme, so
+    # "java\tscript:" must be caught as well.
+    url = re.sub(r"[\x00-\x20\x7f]+", "", html.unescape(url))
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return False
+    return scheme == "" or scheme in SAFE_URL_SCHEMES
+
+
+class _UnsafeUrlStripper(Treeprocessor):
+    """Removes link and image URLs with schemes such as javascript: or data:."""
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                if url is not None and not is_safe_url(url):
+                    del element.attrib[attribute]
+
+
+def render_markdown(summary_md: str) -> str:
+    """
+    Renders a summary to HTML. Summaries are model output, so raw HTML in the
+    markdown is escaped and shown as text rather than passed through, and
+    links and images with unsafe URL schemes lose their URL.
     """
-    Generates an HTML string for the video summary, including metadata and markdown rendering.
+    md = markdown.Markdown(extensions=["fenced_code", "tables", "sane_lists"])
+    md.preprocessors.deregister("html_block")
+    md.inlinePatterns.deregister("html")
+    md.treeprocessors.register(_UnsafeUrlStripper(md), "strip_unsafe_urls", 0)
+    return md.convert(summary_md)
+
+
+def generate_summary_html(video_id: str, summary_md: str, metadata: dict, site: bool = False) -> str:
+    """
+    Generates an HTML string for the video summary, including metadata and the
+    summary rendered from markdown. The page needs no script. By default the
+    styles are inlined; with `site` the page is laid out for
+    `firebase/public/summaries/`, linking the shared stylesheet and the
+    site's other pages.
     """
     # Format metadata for display
     metadata_html = ""
     if metadata:
         metadata_html += "<div>"
         if metadata.get('title'):
-            metadata_html += f"<h1>{metadata['title']}</h1>"
+            metadata_html += f"<h1>{html.escape(metadata['title'])}</h1>"
         if metadata.get('uploader'):
-            metadata_html += f"<p><strong>Uploader:</strong> {metadata['uploader']}</p>"
+            metadata_html += f"<p><strong>Uploader:</strong> {html.escape(metadata['uploader'])}</p>"
         if metadata.get('upload_date'):
             # Format date from YYYYMMDD to YYYY-MM-DD
             upload_date = metadata['upload_date']
             formatted_date = f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
-            metadata_html += f"<p><strong>Upload Date:</strong> {formatted_date}</p>"
+            metadata_html += f"<p><strong>Upload Date:</strong> {html.escape(formatted_date)}</p>"
         if metadata.get('duration'):
-            minutes = metadata['duration'] // 60
-            seconds = metadata['duration'] % 60
+            minutes = int(metadata['duration']) // 60
+            seconds = int(metadata['duration']) % 60
             metadata_html += f"<p><strong>Duration:</strong> {minutes}m {seconds}s</p>"
         if metadata.get('description'):
             # Simple newline to <br> conversion for description
-            desc_lines = metadata['description'].split('\n')
+            desc_lines = [html.escape(line) for line in metadata['description'].split('\n')]
             formatted_desc = "<br>".join(desc_lines[:5]) + ("..." if len(desc_lines) > 5 else "") # Limit description to 5 lines
             metadata_html += f"<p><strong>Description:</strong><br>{formatted_desc}</p>"
         metadata_html += "<hr></div>"
 
-    html_content = f"""
-<!DOCTYPE html>
+    if site:
+        style_html = f'<link rel="stylesheet" href="../{STYLESHEET_NAME}">'
+        nav_html = (f'<hr><p><a href="../index.html">All videos</a> | '
+                    f'<a href="../video.html?video_id={html.escape(video_id)}">Archive options</a></p>')
+    else:
+        style_html = f"<style>\n{SUMMARY_CSS}</style>"
+        nav_html = ""
+
+    title = html.escape((metadata or {}).get('title') or f"Summary for {video_id}")
+    html_content = f"""<!DOCTYPE html>
 <html>
 <head>
-    <title>Summary for {video_id}</title>
+    <meta charset="UTF-8">
+    <title>{title}</title>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <script src="https://cdn.jsdelivr.net/npm/marked/marked.min.js"></script>
-    <style>
-        body {{
-            font-family: 'Arial', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            margin: 0;
-            padding: 20px;
-            background-color: #f4f4f4;
-        }}
-        #content {{
-            max-width: 800px;
-            margin: 20px auto;
-            padding: 30px;
-            background-color: #fff;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-        }}
-        h1, h2, h3, h4, h5, h6 {{
-            color: #0056b3;
-        }}
-        pre {{
-            background-color: #eee;
-            padding: 10px;
-            border-radius: 5px;
-            overflow-x: auto;
-        }}
-        code {{
-            font-family: 'Courier New', Courier, monospace;
-            background-color: #eee;
-            padding: 2px 4px;
-            border-radius: 3px;
-        }}
-    </style>
+    {style_html}
 </head>
 <body>
     <div id="content">
         {metadata_html}
+        <div id="summary">
+        {render_markdown(summary_md)}
+        </div>
+        {nav_html}
     </div>
-    <script>
-        document.getElementById('content').innerHTML +=
-            marked.parse(`{summary_md.replace('`', '\\`')}`);
-    </script>
 </body>
 </html>
 """
@@ -0,0 +1,240 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from core import extract_video_id
+
+# The stage a video has reached. A job's stage only ever moves forward, and a
+# worker resumes a job at the step after its recorded stage.
+STAGES = ("discovered", "downloaded", "transcribed", "summarized", "published")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    video_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    channel_id TEXT,
+    stage TEXT NOT NULL DEFAULT 'discovered',
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, available_at);
+"""
+
+
+class JobQueue:
+    """
+    Durable per-video job queue in SQLite. Workers lease one job at a time;
+    a lease that is not renewed before it expires (because the worker died)
+    makes the job available again, and counts as a failed attempt. A job
+    that fails `max_attempts` times is moved to the 'dead' state and left
+    for inspection, so a video that keeps killing its worker (an OOM, a
+    crash in ffmpeg) is not retried forever.
+    """
+
+    def __init__(self, db_path: str = "data/jobs.sqlite3", lease_seconds: float = 2 * 3600, max_attempts: int = 5,
+                 retry_delay: float = 60.0):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, video_id: str, url: str, channel_id: str | None = None) -> bool:
+        """Adds a job for `video_id` unless one already exists. Returns True if added."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (video_id, url, channel_id, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, url, channel_id, now, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def lease(self, owner: str) -> sqlite3.Row | None:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers
+            # (even in separate processes) can never lease the same job.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT video_id, state, attempts FROM jobs "
+                        "WHERE (state = 'pending' AND available_at <= ?) OR (state = 'leased' AND lease_expires_at < ?) "
+                        "ORDER BY created_at LIMIT 1",
+                        (now, now),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    attempts = row["attempts"]
+                    if row["state"] == "leased":
+                        # The previous worker died holding the job.
+                        attempts += 1
+                        if attempts >= self.max_attempts:
+                            self._conn.execute(
+                                "UPDATE jobs SET state = 'dead', attempts = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                                "last_error = ?, updated_at = ? WHERE video_id = ?",
+                                (attempts, "lease expired: the worker stopped without finishing", now, row["video_id"]),
+                            )
+                            continue
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'leased', attempts = ?, lease_owner = ?, lease_expires_at = ?, updated_at = ? "
+                        "WHERE video_id = ?",
+                        (attempts, owner, now + self.lease_seconds, now, row["video_id"]),
+                    )
+                    break
+                job = self._conn.execute("SELECT * FROM jobs WHERE video_id = ?", (row["video_id"],)).fetchone()
+                self._conn.execute("COMMIT")
+                return job
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def advance(self, video_id: str, owner: str, stage: str):
+        """Records that `video_id` reached `stage` and renews the worker's lease."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET stage = ?, lease_expires_at = ?, updated_at = ? WHERE video_id = ? AND lease_owner = ?",
+                (stage, now + self.lease_seconds, now, video_id, owner),
+            )
+
+    def complete(self, video_id: str, owner: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'done', lease_owner = NULL, lease_expires_at = NULL, last_error = NULL, updated_at = ? "
+                "WHERE video_id = ? AND lease_owner = ?",
+                (time.time(), video_id, owner),
+            )
+
+    def fail(self, video_id: str, owner: str, error: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM jobs WHERE video_id = ?", (video_id,)).fetchone()
+            attempts = row["attempts"] + 1
+            state = "dead" if attempts >= self.max_attempts else "pending"
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "last_error = ?, updated_at = ? WHERE video_id = ? AND lease_owner = ?",
+                (state, attempts, now + self.retry_delay * (2 ** (attempts - 1)), error, now, video_id, owner),
+            )
+
+    def retry_dead(self) -> int:
+        """Moves every dead job back to pending with a fresh attempt count."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, available_at = ?, updated_at = ? WHERE state = 'dead'",
+                (now, now),
+            )
+            return cursor.rowcount
+
+    def status(self) -> dict:
+        with self._lock:
+            counts = self._conn.execute(
+                "SELECT state, stage, COUNT(*) AS n FROM jobs GROUP BY state, stage ORDER BY state, stage"
+            ).fetchall()
+            dead = self._conn.execute(
+                "SELECT video_id, stage, attempts, last_error FROM jobs WHERE state = 'dead' ORDER BY updated_at"
+            ).fetchall()
+        return {
+            "counts": [(row["state"], row["stage"], row["n"]) for row in counts],
+            "dead": [dict(row) for row in dead],
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+def enqueue_channels(queue: JobQueue, discovery, channel_ids: list[str], videos_per_channel: int,
+                     since_last_seen: bool = False) -> int:
+    added = 0
+    for channel_id, video_url in discovery.iter_channel_videos(channel_ids, videos_per_channel, since_last_seen):
+        video_id = extract_video_id(video_url)
+        added += queue.enqueue(video_id, video_url, channel_id)
+        # The job queue now owns the video, so it is no longer pending in the channel state.
+        discovery.mark_processed(channel_id, [video_id])
+    return added
+
+
+def format_status(status: dict) -> str:
+    lines = [f"{'state':<10}{'stage':<14}{'videos':>8}"]
+    lines += [f"{state:<10}{stage:<14}{n:>8}" for state, stage, n in status["counts"]]
+    if status["dead"]:
+        lines.append("")
+        lines.append("Dead-lettered:")
+        lines += [f"  {job['video_id']} (at {job['stage']}, {job['attempts']} attempts): {job['last_error']}" for job in status["dead"]]
+    return "\n".join(lines)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobWorker:
+    """
+    Pulls jobs from a `JobQueue` and moves each video through the remaining
+    stages with the summarizer, recording progress after every stage so a
+    restart continues exactly where the previous worker stopped.
+    """
+
+    def __init__(self, queue: JobQueue, summarizer, prompt: str, worker_id: str | None = None):
+        self.queue = queue
+        self.summarizer = summarizer
+        self.prompt = prompt
+        self.worker_id = worker_id or default_worker_id()
+
+    def _run_stage(self, job, stage: str):
+        storage = self.summarizer.storage
+        video_id = job["video_id"]
+        if stage == "downloaded":
+            self.summarizer.download_audio_if_needed(job["url"])
+        elif stage == "transcribed":
+            self.summarizer.transcribe_audio(video_id, storage.get_audio_path(video_id))
+        elif stage == "summarized":
+            transcript = storage.load_transcript(video_id)
+            self.summarizer.summarize_if_needed(video_id, transcript, self.prompt, publish=False)
+        elif stage == "published":
+            self.summarizer.publish_summary(video_id, storage.load_summary(video_id))
+
+    def process(self, job):
+        video_id = job["video_id"]
+        for stage in STAGES[STAGES.index(job["stage"]) + 1:]:
+            print(f"[{self.worker_id}] {video_id}: {stage}...")
+            self._run_stage(job, stage)
+            self.queue.advance(video_id, self.worker_id, stage)
+
+    def run(self, follow: bool = False, poll_interval: float = 10.0) -> int:
+        """
+        Processes jobs until the queue has nothing ready, or forever when
+        `follow` is set. Returns the number of jobs completed.
+        """
+        completed = 0
+        while True:
+            job = self.queue.lease(self.worker_id)
+            if job is None:
+                if not follow:
+                    return completed
+                time.sleep(poll_interval)
+                continue
+            try:
+                self.process(job)
+            except Exception as e:
+                print(f"Failed to process video {job['video_id']} (attempt {job['attempts'] + 1}): {e}")
+                self.queue.fail(job["video_id"], self.worker_id, str(e))
+                continue
+            self.queue.complete(job["video_id"], self.worker_id)
+            completed += 1
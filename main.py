@@ -1,22 +1,197 @@
 import os
 import argparse
-from core import YouTubeSummarizer
-from storage import LocalStorage, FirebaseStorage
+from core import YouTubeSummarizer, extract_video_id
+from discovery import ChannelDiscovery
+from job_queue import JobQueue, JobWorker, enqueue_channels, format_status
+from storage import CompactStorage, LocalStorage, FirebaseStorage
+from summary_cache import SummaryCache
+from api_clients import CircuitBreaker, RateLimitedClient
+from metrics import InstrumentedStorage, Metrics, profiling
+from cache_manager import CacheManagedStorage
+from transcription import LOCAL_BACKENDS
+from search import GeminiEmbedder, IndexingStorage, SearchIndex, format_results
+from site_builder import SiteBuilder
 
 def main():
     parser = argparse.ArgumentParser(description="Transcribe and summarize YouTube videos.")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--youtube_url", help="The URL of the YouTube video to process.")
     group.add_argument("--channels", nargs='+', help="A list of YouTube channel IDs to process.")
+    group.add_argument("--worker", action="store_true", help="Process queued videos until the job queue is empty.")
+    group.add_argument("--status", action="store_true", help="Show the job queue backlog.")
+    group.add_argument("--retry-dead", action="store_true", help="Return dead-lettered jobs to the queue.")
+    group.add_argument("--search", metavar="QUERY", help="Search saved transcripts and summaries.")
+    group.add_argument("--reindex", action="store_true", help="Add saved transcripts and summaries missing from the search index.")
+    group.add_argument("--migrate-storage", action="store_true", help="Move the data/ directory layout into the compact store.")
+    group.add_argument("--rebuild-index", action="store_true", help="Rebuild the website's summary index from the bucket.")
+    group.add_argument("--build-site", nargs="*", metavar="VIDEO_ID", help="Regenerate changed static summary pages, for the given videos or all of them.")
+    parser.add_argument("--transcription-backend", choices=LOCAL_BACKENDS, help="Local transcription engine (default: TRANSCRIPTION_BACKEND).")
+    parser.add_argument("--whisper-model", help="Whisper model size for local transcription (default: WHISPER_MODEL).")
+    parser.add_argument("--semantic", action="store_true", help="With --search, rank summaries by embedding similarity instead of keywords.")
+    parser.add_argument("--limit", type=int, default=10, help="Number of --search results.")
+    parser.add_argument("--deploy", action="store_true", help="With --build-site, deploy the hosting site if any page changed.")
+    parser.add_argument("--enqueue", action="store_true", help="Add --youtube_url or --channels videos to the job queue instead of processing them.")
+    parser.add_argument("--follow", action="store_true", help="With --worker, keep polling for new jobs instead of exiting.")
     parser.add_argument("--videos-per-channel", type=int, default=1, help="Number of recent videos to process per channel.")
+    parser.add_argument("--since-last-seen", action="store_true", help="Only process channel videos posted since the previous run.")
+    parser.add_argument("--discovery-workers", type=int, default=8, help="Number of channels listed concurrently.")
+    parser.add_argument("--metrics-file", help="Append per-stage timing events to this JSON-lines file.")
+    parser.add_argument("--profile", help="Write cProfile stats for the run to this file.")
+    parser.add_argument("--stream", action="store_true", help="With --youtube_url, transcribe while streaming and keep a rolling summary.")
+    parser.add_argument("--stream-window", type=float, default=30.0, help="Seconds of audio transcribed at a time in stream mode.")
+    parser.add_argument("--summary-interval", type=float, default=300.0, help="Seconds of audio between rolling summary updates in stream mode.")
+    parser.add_argument("--pipeline", action="store_true", help="Process channel videos in overlapping download/transcribe/summarize stages.")
+    parser.add_argument("--download-workers", type=int, default=4, help="Concurrent audio downloads in pipeline mode.")
+    parser.add_argument("--transcribe-workers", type=int, default=1, help="Concurrent transcriptions in pipeline mode.")
+    parser.add_argument("--summarize-workers", type=int, default=4, help="Concurrent Gemini summarization calls in pipeline mode.")
     args = parser.parse_args()
+    if args.enqueue and not (args.youtube_url or args.channels):
+        parser.error("--enqueue needs --youtube_url or --channels")
 
     # --- Configuration ---
+    # SQLite job queue used by --enqueue, --worker, --status and --retry-dead.
+    JOB_QUEUE_PATH = "data/jobs.sqlite3"
     # Choose transcription mode: 'local' or 'cloud'
     TRANSCRIPTION_MODE = 'local' 
-    # Choose storage mode: 'local' or 'firebase'
+    # How audio is cached: 'mp3' re-encodes every download to 192 kbps mp3,
+    # 'native' keeps the stream as served (opus/m4a), and 'pcm' decodes the stream
+    # straight to 16 kHz mono WAV that Whisper reads without decoding again.
+    AUDIO_FORMAT = 'native'
+    # Local transcription engine: 'whisper' (openai-whisper, float32 PyTorch) or
+    # 'faster-whisper' (CTranslate2 int8 with voice activity detection, usually
+    # several times faster on CPU; needs `pip install faster-whisper`).
+    # benchmarks/transcription_rtf.py compares them on your own audio.
+    TRANSCRIPTION_BACKEND = args.transcription_backend or 'whisper'
+    # Whisper model size for local transcription ('tiny', 'base', 'small', 'medium', 'large').
+    WHISPER_MODEL = args.whisper_model or 'base'
+    # Number of local Whisper worker processes. Values above 1 load the model once
+    # in each of that many processes instead of once in this one.
+    WHISPER_WORKERS = 1
+    # Split audio longer than this many seconds at silences and transcribe the
+    # chunks in parallel (0 disables chunking, except for cloud uploads that
+    # exceed the OpenAI file size limit).
+    CHUNK_SECONDS = 0
+    CHUNK_OVERLAP_SECONDS = 2.0
+    # Chunks sent to OpenAI at once in cloud mode. Local mode transcribes chunks
+    # in parallel only across the WHISPER_WORKERS pool, one at a time otherwise.
+    CHUNK_WORKERS = 4
+    # Gemini model used for summaries. Changing it (or the prompt below) regenerates
+    # summaries on the next run; results for earlier settings stay in the summary cache.
+    GEMINI_MODEL = 'gemini-2.5-flash'
+    SUMMARY_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    # Transcripts longer than this many tokens are summarized in parts that are
+    # then combined, with up to SUMMARY_MAP_WORKERS parts in flight at once.
+    SUMMARY_TOKEN_BUDGET = 100_000
+    SUMMARY_MAP_WORKERS = 4
+    # API quotas. Calls are throttled to stay under these limits and transient
+    # errors (429s, 5xx, timeouts) are retried with backoff. None disables a limit.
+    GEMINI_REQUESTS_PER_MINUTE = 1000
+    GEMINI_TOKENS_PER_MINUTE = 1_000_000
+    GEMINI_MAX_CONCURRENCY = 8
+    OPENAI_REQUESTS_PER_MINUTE = 50
+    OPENAI_MAX_CONCURRENCY = 4
+    # Transcripts and summaries are indexed for --search as they are saved.
+    # With SEARCH_EMBEDDINGS, summaries are also embedded with Gemini for --semantic.
+    SEARCH_INDEX_PATH = "data/search.sqlite3"
+    SEARCH_EMBEDDINGS = False
+    SEARCH_EMBEDDING_MODEL = "models/text-embedding-004"
+    # --build-site writes static summary pages to SITE_PUBLIC_DIR/summaries/ and
+    # records what it built in SITE_MANIFEST_PATH, so unchanged pages are skipped.
+    SITE_PUBLIC_DIR = "firebase/public"
+    SITE_MANIFEST_PATH = "data/site-manifest.json"
+    # Disk budgets for the local cache, per artifact type (None = unbounded).
+    # Audio is deleted least-recently-used first once its transcript exists. Text
+    # is only deleted when it is also in the Firebase bucket, which re-downloads
+    # it when it is next needed.
+    CACHE_BUDGETS = {
+        "audio": 10 * 1024 ** 3,
+        "transcripts": None,
+        "summaries": None,
+        "metadata": None,
+    }
+    CACHE_MAX_TOTAL_BYTES = None
+    # Choose storage mode: 'local', 'compact' or 'firebase'. 'compact' keeps text
+    # in one compressed SQLite file and shards audio; see --migrate-storage.
     STORAGE_MODE = 'firebase'
 
+    # --- Job queue commands that need no storage ---
+    if args.status:
+        print(format_status(JobQueue(JOB_QUEUE_PATH).status()))
+        return
+    if args.retry_dead:
+        print(f"Requeued {JobQueue(JOB_QUEUE_PATH).retry_dead()} dead jobs.")
+        return
+
+    if args.migrate_storage:
+        # Migration moves audio and HTML out of data/audio and data/summaries,
+        # which would break the cache that local and firebase storage read.
+        if STORAGE_MODE != 'compact':
+            print("Error: --migrate-storage needs STORAGE_MODE = 'compact'.")
+            return
+        counts = CompactStorage().migrate_from(LocalStorage())
+        print("Migrated " + ", ".join(f"{n} {kind}" for kind, n in sorted(counts.items())) + ".")
+        print("The old data/transcripts, data/summaries, data/video-metadata and data/channels files can be deleted.")
+        return
+
+    # --- Storage Initialization ---
+    if STORAGE_MODE == 'local':
+        storage = LocalStorage()
+    elif STORAGE_MODE == 'compact':
+        storage = CompactStorage()
+    elif STORAGE_MODE == 'firebase':
+        # TODO: Configure Firebase
+        FIREBASE_CRED_PATH = "firebase-serviceaccount-credentials.json"
+        FIREBASE_BUCKET_NAME = "yt-summaries-1984.firebasestorage.app"
+        # Upload to the bucket in the background instead of on every save.
+        FIREBASE_WRITE_BEHIND = True
+        local_cache = LocalStorage()
+        storage = FirebaseStorage(local_storage=local_cache, cred_path=FIREBASE_CRED_PATH, bucket_name=FIREBASE_BUCKET_NAME,
+                                  write_behind=FIREBASE_WRITE_BEHIND)
+    else:
+        raise ValueError(f"Invalid STORAGE_MODE: {STORAGE_MODE}")
+
+    # --- Search ---
+    if args.search or args.reindex:
+        embedder = None
+        if SEARCH_EMBEDDINGS or args.semantic:
+            embedder = GeminiEmbedder(os.environ.get("GEMINI_API_KEY", ""), SEARCH_EMBEDDING_MODEL)
+        search_index = SearchIndex(SEARCH_INDEX_PATH, embedder=embedder)
+        if args.reindex:
+            # Only files in the local cache are indexed; nothing is downloaded.
+            print(f"Indexed {search_index.backfill(getattr(storage, 'local_storage', storage))} files.")
+        elif args.semantic:
+            print(format_results(search_index.semantic_search(args.search, args.limit), storage))
+        else:
+            print(format_results(search_index.search(args.search, args.limit), storage))
+        search_index.close()
+        return
+
+    if args.rebuild_index:
+        if not isinstance(storage, FirebaseStorage):
+            print("Error: --rebuild-index needs STORAGE_MODE = 'firebase'.")
+            return
+        storage.rebuild_index()
+        return
+
+    if args.build_site is not None:
+        site_builder = SiteBuilder(storage, SITE_PUBLIC_DIR, SITE_MANIFEST_PATH)
+        changed = site_builder.build(args.build_site)
+        if args.deploy:
+            site_builder.deploy(changed)
+        return
+
+    # --- Job queue enqueueing ---
+    if args.enqueue:
+        job_queue = JobQueue(JOB_QUEUE_PATH)
+        if args.youtube_url:
+            added = int(job_queue.enqueue(extract_video_id(args.youtube_url), args.youtube_url))
+        else:
+            discovery = ChannelDiscovery(storage, max_workers=args.discovery_workers)
+            added = enqueue_channels(job_queue, discovery, args.channels, args.videos_per_channel, args.since_last_seen)
+        print(f"Queued {added} new videos.")
+        storage.flush()
+        return
+
     # TODO: Set your Gemini API key here.
     # You can get a key from https://aistudio.google.com/app/apikey
     gemini_api_key = os.environ.get("GEMINI_API_KEY", "")
@@ -32,36 +207,89 @@ def main():
         print("Please set the OPENAI_API_KEY environment variable or replace 'YOUR_API_KEY_HERE' in main.py.")
         return
 
-    # --- Storage Initialization ---
-    if STORAGE_MODE == 'local':
-        storage = LocalStorage()
-    elif STORAGE_MODE == 'firebase':
-        # TODO: Configure Firebase
-        FIREBASE_CRED_PATH = "firebase-serviceaccount-credentials.json"
-        FIREBASE_BUCKET_NAME = "yt-summaries-1984.firebasestorage.app"
-        local_cache = LocalStorage()
-        storage = FirebaseStorage(local_storage=local_cache, cred_path=FIREBASE_CRED_PATH, bucket_name=FIREBASE_BUCKET_NAME)
-    else:
-        raise ValueError(f"Invalid STORAGE_MODE: {STORAGE_MODE}")
+    metrics = Metrics(args.metrics_file)
+    storage = CacheManagedStorage(InstrumentedStorage(storage, metrics), CACHE_BUDGETS, CACHE_MAX_TOTAL_BYTES)
+
+    gemini_limiter = RateLimitedClient(
+        "Gemini",
+        requests_per_minute=GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=GEMINI_TOKENS_PER_MINUTE,
+        max_concurrency=GEMINI_MAX_CONCURRENCY,
+        circuit_breaker=CircuitBreaker(),
+    )
+    openai_limiter = RateLimitedClient(
+        "OpenAI",
+        requests_per_minute=OPENAI_REQUESTS_PER_MINUTE,
+        max_concurrency=OPENAI_MAX_CONCURRENCY,
+        circuit_breaker=CircuitBreaker(),
+    )
+
+    search_embedder = GeminiEmbedder(gemini_api_key, SEARCH_EMBEDDING_MODEL, limiter=gemini_limiter) if SEARCH_EMBEDDINGS else None
+    search_index = SearchIndex(SEARCH_INDEX_PATH, embedder=search_embedder)
+    storage = IndexingStorage(storage, search_index)
 
     summarizer = YouTubeSummarizer(
         storage=storage,
         gemini_api_key=gemini_api_key,
         transcription_mode=TRANSCRIPTION_MODE,
-        openai_api_key=openai_api_key
+        openai_api_key=openai_api_key,
+        whisper_model_name=WHISPER_MODEL,
+        whisper_workers=WHISPER_WORKERS,
+        local_backend=TRANSCRIPTION_BACKEND,
+        chunk_seconds=CHUNK_SECONDS,
+        chunk_overlap_seconds=CHUNK_OVERLAP_SECONDS,
+        chunk_workers=CHUNK_WORKERS,
+        gemini_model_name=GEMINI_MODEL,
+        summary_cache=SummaryCache(max_bytes=SUMMARY_CACHE_MAX_BYTES),
+        summary_token_budget=SUMMARY_TOKEN_BUDGET,
+        summary_map_workers=SUMMARY_MAP_WORKERS,
+        gemini_limiter=gemini_limiter,
+        openai_limiter=openai_limiter,
+        discovery_workers=args.discovery_workers,
+        metrics=metrics,
+        audio_format=AUDIO_FORMAT,
     )
 
     prompt = "Provide a one-paragraph summary and a list of key takeaways from the following transcript. Please do this in the original language of the transcript."
 
     print(args)
     try:
-        if args.youtube_url:
-            summary_file_path = summarizer.process_video(args.youtube_url, prompt)
-            print(f"Summary saved to: {summary_file_path}")
-        elif args.channels:
-            summarizer.process_channels(args.channels, args.videos_per_channel, prompt)
+        with profiling(args.profile):
+            if args.worker:
+                worker = JobWorker(JobQueue(JOB_QUEUE_PATH), summarizer, prompt)
+                completed = worker.run(follow=args.follow)
+                print(f"Worker finished: {completed} videos completed.")
+            elif args.youtube_url and args.stream:
+                summary_file_path = summarizer.process_stream(
+                    args.youtube_url,
+                    prompt,
+                    window_seconds=args.stream_window,
+                    summary_interval=args.summary_interval,
+                )
+                print(f"Summary saved to: {summary_file_path}")
+            elif args.youtube_url:
+                summary_file_path = summarizer.process_video(args.youtube_url, prompt)
+                print(f"Summary saved to: {summary_file_path}")
+            elif args.channels and args.pipeline:
+                summarizer.process_channels_pipelined(
+                    args.channels,
+                    args.videos_per_channel,
+                    prompt,
+                    download_workers=args.download_workers,
+                    transcribe_workers=args.transcribe_workers,
+                    summarize_workers=args.summarize_workers,
+                    since_last_seen=args.since_last_seen,
+                )
+            elif args.channels:
+                summarizer.process_channels(args.channels, args.videos_per_channel, prompt, since_last_seen=args.since_last_seen)
     except Exception as e:
         print(f"An error occurred: {e}")
+    finally:
+        summarizer.close()
+        storage.flush()
+        print(metrics.summary_table())
+        metrics.close()
+        search_index.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,151 @@
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+from storage_interface import StorageInterface, StorageWrapper
+
+
+class Metrics:
+    """
+    Collects per-stage timings and counters for a run. Every finished stage
+    is appended as one JSON line to `jsonl_path` (when set) and folded into
+    the totals printed by `summary_table`. Safe to use from pipeline threads.
+    """
+
+    def __init__(self, jsonl_path: str | None = None):
+        self._lock = threading.Lock()
+        self._stages: dict[str, dict] = {}
+        self._counters: dict[str, int] = {}
+        self._jsonl = open(jsonl_path, "a") if jsonl_path else None
+        self._started_at = time.perf_counter()
+
+    def _emit(self, event: dict):
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(event) + "\n")
+            self._jsonl.flush()
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """
+        Times the enclosed block as one call of stage `name`. The yielded dict
+        can be filled in with `bytes` and `audio_seconds` by the caller.
+        """
+        record = dict(fields)
+        started_at = time.perf_counter()
+        ok = True
+        try:
+            yield record
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.add(name, time.perf_counter() - started_at, ok=ok, **record)
+
+    def add(self, name: str, wall: float, ok: bool = True, **fields):
+        """Records one already-timed call of stage `name`."""
+        with self._lock:
+            totals = self._stages.setdefault(name, {"calls": 0, "errors": 0, "wall": 0.0, "bytes": 0, "audio_seconds": 0.0})
+            totals["calls"] += 1
+            totals["errors"] += 0 if ok else 1
+            totals["wall"] += wall
+            totals["bytes"] += fields.get("bytes") or 0
+            totals["audio_seconds"] += fields.get("audio_seconds") or 0.0
+            self._emit({
+                "type": "stage",
+                "stage": name,
+                "wall_seconds": round(wall, 6),
+                "ok": ok,
+                "thread": threading.current_thread().name,
+                "ts": time.time(),
+                **fields,
+            })
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+            self._emit({"type": "counter", "name": name, "n": n, "ts": time.time()})
+
+    def summary_table(self) -> str:
+        with self._lock:
+            stages = {name: dict(totals) for name, totals in self._stages.items()}
+            counters = dict(self._counters)
+        elapsed = time.perf_counter() - self._started_at
+
+        lines = [f"Run time: {elapsed:.1f}s"]
+        header = f"{'stage':<36}{'calls':>7}{'errors':>8}{'total s':>10}{'mean s':>9}{'MB':>9}{'audio x':>9}"
+        lines += [header, "-" * len(header)]
+        for name, totals in sorted(stages.items(), key=lambda item: -item[1]["wall"]):
+            mean = totals["wall"] / totals["calls"]
+            # Seconds of audio handled per second of wall time in this stage.
+            speed = f"{totals['audio_seconds'] / totals['wall']:.1f}" if totals["audio_seconds"] and totals["wall"] else "-"
+            lines.append(
+                f"{name:<36}{totals['calls']:>7}{totals['errors']:>8}{totals['wall']:>10.2f}{mean:>9.3f}"
+                f"{totals['bytes'] / 1e6:>9.1f}{speed:>9}"
+            )
+        if counters:
+            lines.append("")
+            lines += [f"{name:<36}{value:>7}" for name, value in sorted(counters.items())]
+        return "\n".join(lines)
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+@contextmanager
+def profiling(output_path: str | None):
+    """
+    Runs the enclosed block under cProfile and writes the stats to
+    `output_path` (readable with pstats or snakeviz); a no-op without a path.
+    Only the calling thread is profiled; pipeline and pool threads are named
+    after their stage so `py-spy record --threads` output stays readable.
+    """
+    if not output_path:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(output_path)
+        print(f"Profile written to {output_path}")
+
+
+def _content_size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value))
+    return 0
+
+
+class InstrumentedStorage(StorageWrapper):
+    """
+    Wraps another storage and records every call as a `storage.<method>`
+    stage, with bytes moved for saves and loads and hit/miss counters for
+    existence checks.
+    """
+
+    def __init__(self, storage: StorageInterface, metrics: Metrics):
+        super().__init__(storage)
+        self.metrics = metrics
+
+    def _call(self, name: str, *args, **kwargs):
+        # Path getters do no I/O, so timing them would only add noise, and
+        # lock() only builds the context manager; the wait happens inside the `with`.
+        if name.startswith("get_") or name == "lock":
+            return super()._call(name, *args, **kwargs)
+        with self.metrics.stage(f"storage.{name}") as record:
+            result = super()._call(name, *args, **kwargs)
+            if name.startswith("save_"):
+                record["bytes"] = _content_size(args[-1] if args else next(iter(kwargs.values()), None))
+            elif name.startswith("load_"):
+                record["bytes"] = _content_size(result)
+        if name.endswith("_exists"):
+            kind = name[:-len("_exists")]
+            self.metrics.count(f"cache.{kind}.{'hit' if result else 'miss'}")
+        return result
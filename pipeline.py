@@ -0,0 +1,143 @@
+import queue
+import threading
+from pathlib import Path
+
+_DONE = object()
+
+
+class _Stage:
+    """
+    A pool of worker threads that reads items from an input queue, applies a
+    handler and passes the result on to an output queue. Items for which the
+    handler raises are reported and dropped so one bad video never stalls
+    the rest of the run.
+    """
+
+    def __init__(self, name: str, workers: int, handler, inbox: queue.Queue, outbox: queue.Queue | None, on_error):
+        self.name = name
+        self.workers = max(1, workers)
+        self.handler = handler
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_error = on_error
+        self.next_stage_workers = 1
+        self._remaining = self.workers
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            video_url = item[0]
+            try:
+                result = self.handler(*item)
+            except Exception as e:
+                self.on_error(video_url, e)
+                continue
+            if result is not None and self.outbox is not None:
+                # Blocks while the next stage is saturated, which is what
+                # propagates backpressure up the pipeline.
+                self.outbox.put(result)
+
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if last and self.outbox is not None:
+            for _ in range(self.next_stage_workers):
+                self.outbox.put(_DONE)
+
+
+class VideoPipeline:
+    """
+    Runs download, transcription and summarization as three overlapping
+    stages joined by bounded queues, so the network, the CPU and the Gemini
+    API are kept busy at the same time instead of one after another.
+    """
+
+    def __init__(self, summarizer, prompt: str, download_workers: int = 4, transcribe_workers: int = 1,
+                 summarize_workers: int = 4, queue_size: int = 0):
+        self.summarizer = summarizer
+        self.prompt = prompt
+        self.download_workers = download_workers
+        self.transcribe_workers = transcribe_workers
+        self.summarize_workers = summarize_workers
+        # By default each queue holds one pending item per downstream worker.
+        self.queue_size = queue_size
+        self.results: dict[str, Path] = {}
+        self.errors: dict[str, Exception] = {}
+        self._results_lock = threading.Lock()
+
+    def _queue(self, consumers: int) -> queue.Queue:
+        return queue.Queue(maxsize=self.queue_size or max(1, consumers))
+
+    def _record_success(self, video_url: str, summary_path: Path):
+        with self._results_lock:
+            self.results[video_url] = summary_path
+        print(f"Processed video: {video_url}")
+        print(f"Summary saved to: {summary_path}")
+
+    def _record_error(self, video_url: str, error: Exception):
+        with self._results_lock:
+            self.errors[video_url] = error
+        print(f"Failed to process video {video_url}: {error}")
+
+    def _download(self, video_url: str):
+        video_id = self.summarizer.get_video_id(video_url)
+        if self.summarizer.has_current_summary(video_id, self.prompt):
+            print(f"Summary for video {video_id} found in cache.")
+            self._record_success(video_url, self.summarizer.storage.get_summary_html_path(video_id))
+            return None
+        audio_path = self.summarizer.download_audio_if_needed(video_url)
+        return (video_url, video_id, audio_path)
+
+    def _transcribe(self, video_url: str, video_id: str, audio_path: Path):
+        transcript = self.summarizer.transcribe_audio(video_id, audio_path)
+        return (video_url, video_id, transcript)
+
+    def _summarize(self, video_url: str, video_id: str, transcript: str):
+        self.summarizer.summarize_if_needed(video_id, transcript, self.prompt)
+        self._record_success(video_url, self.summarizer.storage.get_summary_html_path(video_id))
+        return None
+
+    def run(self, video_urls) -> dict[str, Path]:
+        """
+        Processes every URL yielded by `video_urls` (which may itself be a
+        lazy generator) and returns a mapping of URL to summary HTML path for
+        the videos that succeeded. Failures are collected in `self.errors`.
+        """
+        download_queue = self._queue(self.download_workers)
+        transcribe_queue = self._queue(self.transcribe_workers)
+        summarize_queue = self._queue(self.summarize_workers)
+
+        stages = [
+            _Stage("download", self.download_workers, self._download, download_queue, transcribe_queue, self._record_error),
+            _Stage("transcribe", self.transcribe_workers, self._transcribe, transcribe_queue, summarize_queue, self._record_error),
+            _Stage("summarize", self.summarize_workers, self._summarize, summarize_queue, None, self._record_error),
+        ]
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage_workers = next_stage.workers
+        for stage in stages:
+            stage.start()
+
+        try:
+            for video_url in video_urls:
+                download_queue.put((video_url,))
+        finally:
+            for _ in range(stages[0].workers):
+                download_queue.put(_DONE)
+            for stage in stages:
+                stage.join()
+
+        return self.results
@@ -0,0 +1,213 @@
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+import google.generativeai as genai
+import numpy as np
+from api_clients import GEMINI_REQUEST_OPTIONS
+from storage_interface import StorageInterface, StorageWrapper
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    video_id UNINDEXED,
+    kind UNINDEXED,
+    text,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS indexed (
+    video_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    doc_rowid INTEGER NOT NULL,
+    vector_row INTEGER,
+    PRIMARY KEY (video_id, kind)
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Embedding models only read the start of long inputs anyway.
+EMBED_MAX_CHARS = 8000
+
+
+def _fts_query(query: str) -> str:
+    # Every word must match; quoting keeps punctuation in user queries from
+    # being parsed as FTS5 operators.
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+class GeminiEmbedder:
+    """Embeds text with a Gemini embedding model through the shared rate limiter."""
+
+    def __init__(self, api_key: str, model_name: str = "models/text-embedding-004", limiter=None):
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.limiter = limiter
+
+    def embed(self, text: str, task_type: str = "retrieval_document") -> np.ndarray:
+        kwargs = {"model": self.model_name, "content": text[:EMBED_MAX_CHARS], "task_type": task_type}
+        if self.limiter is None:
+            result = genai.embed_content(**kwargs)
+        else:
+            result = self.limiter.call(genai.embed_content, request_options=GEMINI_REQUEST_OPTIONS, **kwargs)
+        return np.asarray(result["embedding"], dtype=np.float32)
+
+
+class SearchIndex:
+    """
+    Search over transcripts and summaries. Keyword queries use an SQLite FTS5
+    inverted index ranked by BM25. When an embedder is given, summaries are
+    also embedded into an append-only float32 matrix that is memory-mapped
+    for semantic queries, so neither kind of query loads the corpus into
+    memory. Documents are re-indexed only when their content changes.
+    """
+
+    def __init__(self, db_path: str = "data/search.sqlite3", embedder: GeminiEmbedder | None = None):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder
+        self.vectors_path = Path(db_path).with_suffix(".vectors.f32")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _setting(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _vector_dim(self, model_name: str, dim: int | None = None) -> int | None:
+        """Returns the matrix width, fixing it (and the model) on the first vector stored."""
+        stored_model = self._setting("embedding_model")
+        if stored_model is not None and stored_model != model_name:
+            raise ValueError(f"Search vectors were built with {stored_model}; delete {self.vectors_path} to switch models.")
+        stored_dim = self._setting("embedding_dim")
+        if stored_dim is None and dim is not None:
+            self._conn.executemany("INSERT INTO settings (key, value) VALUES (?, ?)",
+                                   [("embedding_model", model_name), ("embedding_dim", str(dim))])
+            return dim
+        return int(stored_dim) if stored_dim is not None else None
+
+    def _append_vector(self, vector: np.ndarray) -> int:
+        dim = self._vector_dim(self.embedder.model_name, len(vector))
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        with open(self.vectors_path, "ab") as f:
+            row = f.tell() // (dim * 4)
+            f.write(vector.astype(np.float32).tobytes())
+        return row
+
+    def update(self, video_id: str, kind: str, text: str):
+        """Indexes (or re-indexes) one document; `kind` is 'transcript' or 'summary'."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        wants_vector = self.embedder is not None and kind == "summary"
+        select = "SELECT digest, doc_rowid, vector_row FROM indexed WHERE video_id = ? AND kind = ?"
+        with self._lock:
+            row = self._conn.execute(select, (video_id, kind)).fetchone()
+        if row is not None and row[0] == digest and (row[2] is not None or not wants_vector):
+            return
+        # Embedding is a network call, so it runs outside the lock.
+        vector = self.embedder.embed(text) if wants_vector else None
+        with self._lock, self._conn:
+            row = self._conn.execute(select, (video_id, kind)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM documents WHERE rowid = ?", (row[1],))
+            cursor = self._conn.execute("INSERT INTO documents (video_id, kind, text) VALUES (?, ?, ?)", (video_id, kind, text))
+            # A replaced vector stays in the matrix but is no longer referenced.
+            vector_row = self._append_vector(vector) if vector is not None else None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO indexed (video_id, kind, digest, doc_rowid, vector_row) VALUES (?, ?, ?, ?, ?)",
+                (video_id, kind, digest, cursor.lastrowid, vector_row),
+            )
+
+    def search(self, query: str, limit: int = 10, kind: str | None = None) -> list[dict]:
+        """Keyword search, best BM25 match first."""
+        sql = ("SELECT video_id, kind, bm25(documents) AS score, snippet(documents, 2, '[', ']', '...', 16) "
+               "FROM documents WHERE documents MATCH ?")
+        params = [_fts_query(query)]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        # bm25() is lower for better matches; flip it so higher is better.
+        return [{"video_id": v, "kind": k, "score": -score, "snippet": snippet} for v, k, score, snippet in rows]
+
+    def semantic_search(self, query: str, limit: int = 10) -> list[dict]:
+        """Nearest summaries to `query` by cosine similarity."""
+        if self.embedder is None:
+            raise ValueError("Semantic search needs an embedder.")
+        with self._lock:
+            dim = self._vector_dim(self.embedder.model_name)
+            live = self._conn.execute("SELECT vector_row, video_id, kind FROM indexed WHERE vector_row IS NOT NULL").fetchall()
+        if dim is None or not live:
+            return []
+        query_vector = self.embedder.embed(query, task_type="retrieval_query")
+        query_vector /= np.linalg.norm(query_vector) or 1.0
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r").reshape(-1, dim)
+        rows = np.array([row for row, _, _ in live])
+        scores = matrix[rows] @ query_vector
+        top = np.argsort(-scores)[:limit]
+        return [{"video_id": live[i][1], "kind": live[i][2], "score": float(scores[i]), "snippet": ""} for i in top]
+
+    def backfill(self, storage) -> int:
+        """
+        Indexes every transcript and summary in a local or compact storage
+        that is missing from the index or has changed. Returns the number of
+        documents read.
+        """
+        count = 0
+        for kind, directory, pattern in (("transcript", "transcripts_dir", "*.txt"),
+                                         ("summary", "summaries_dir", "*.md")):
+            if hasattr(storage, "iter_texts"):
+                documents = storage.iter_texts(kind)
+            else:
+                documents = ((path.stem, path.read_text()) for path in sorted(Path(getattr(storage, directory)).glob(pattern)))
+            for video_id, text in documents:
+                self.update(video_id, kind, text)
+                count += 1
+        return count
+
+    def close(self):
+        self._conn.close()
+
+
+class IndexingStorage(StorageWrapper):
+    """
+    Wraps another storage and keeps a `SearchIndex` up to date with every
+    transcript and summary saved through it. An indexing failure is reported
+    but never fails the save itself.
+    """
+
+    def __init__(self, storage: StorageInterface, index: SearchIndex):
+        super().__init__(storage)
+        self.index = index
+
+    def _index(self, video_id: str, kind: str, text: str):
+        try:
+            self.index.update(video_id, kind, text)
+        except Exception as e:
+            print(f"Failed to update search index for {kind} of video {video_id}: {e}")
+
+    def save_transcript(self, video_id: str, transcript: str):
+        self.storage.save_transcript(video_id, transcript)
+        self._index(video_id, "transcript", transcript)
+
+    def save_summary(self, video_id: str, summary: str):
+        self.storage.save_summary(video_id, summary)
+        self._index(video_id, "summary", summary)
+
+
+def format_results(results: list[dict], storage) -> str:
+    if not results:
+        return "No matches."
+    lines = []
+    for result in results:
+        video_id = result["video_id"]
+        title = storage.load_metadata(video_id).get("title") if storage.metadata_exists(video_id) else None
+        lines.append(f"{result['score']:8.3f}  {video_id}  [{result['kind']}]  {title or ''}")
+        if result["snippet"]:
+            lines.append(f"          {' '.join(result['snippet'].split())}")
+    return "\n".join(lines)
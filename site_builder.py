@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+from html_generator import STYLESHEET_NAME, SUMMARY_CSS, TEMPLATE_VERSION, generate_summary_html
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class SiteBuilder:
+    """
+    Builds the static summary pages under `public_dir/summaries/` for
+    Firebase Hosting. A manifest records a hash of each page's summary,
+    metadata and template version, so a build regenerates only the pages
+    whose inputs changed. `deploy` runs `firebase deploy --only hosting`,
+    which uploads only files whose content Hosting does not already have,
+    and is skipped when the build changed nothing.
+    """
+
+    def __init__(self, storage, public_dir: str = "firebase/public", manifest_path: str = "data/site-manifest.json"):
+        self.storage = storage
+        self.public_dir = Path(public_dir)
+        self.pages_dir = self.public_dir / "summaries"
+        self.manifest_path = Path(manifest_path)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"stylesheet": None, "pages": {}}
+
+    def _save_manifest(self):
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=2, sort_keys=True))
+
+    def page_path(self, video_id: str) -> Path:
+        return self.pages_dir / f"{video_id}.html"
+
+    def _summaries(self, video_ids: list[str] | None):
+        """Yields (video_id, summary markdown) for the requested or all stored summaries."""
+        if video_ids:
+            for video_id in video_ids:
+                if self.storage.summary_exists(video_id):
+                    yield video_id, self.storage.load_summary(video_id)
+                else:
+                    print(f"No summary for video {video_id}; skipping.")
+            return
+        if hasattr(self.storage, "iter_texts"):
+            yield from self.storage.iter_texts("summary")
+            return
+        if hasattr(self.storage, "summary_ids"):
+            # FirebaseStorage lists the bucket, so summaries made on other
+            # machines get pages too; loading one fills the local cache.
+            for video_id in self.storage.summary_ids():
+                yield video_id, self.storage.load_summary(video_id)
+            return
+        for path in sorted(Path(self.storage.summaries_dir).glob("*.md")):
+            yield path.stem, path.read_text()
+
+    def build(self, video_ids: list[str] | None = None) -> list[Path]:
+        """
+        Regenerates stale pages, for `video_ids` or for every stored summary,
+        and returns the paths of the files that changed.
+        """
+        changed = []
+        stylesheet_hash = _digest(SUMMARY_CSS)
+        stylesheet_path = self.public_dir / STYLESHEET_NAME
+        if self.manifest.get("stylesheet") != stylesheet_hash or not stylesheet_path.exists():
+            _write_atomic(stylesheet_path, SUMMARY_CSS)
+            self.manifest["stylesheet"] = stylesheet_hash
+            changed.append(stylesheet_path)
+
+        pages = self.manifest.setdefault("pages", {})
+        for video_id, summary_md in self._summaries(video_ids):
+            metadata = self.storage.load_metadata(video_id) if self.storage.metadata_exists(video_id) else {}
+            page_hash = _digest(str(TEMPLATE_VERSION), summary_md, json.dumps(metadata, sort_keys=True))
+            path = self.page_path(video_id)
+            if pages.get(video_id) == page_hash and path.exists():
+                continue
+            _write_atomic(path, generate_summary_html(video_id, summary_md, metadata, site=True))
+            pages[video_id] = page_hash
+            changed.append(path)
+
+        self._save_manifest()
+        print(f"Site build: {len(changed)} files changed.")
+        return changed
+
+    def deploy(self, changed: list[Path]) -> bool:
+        """Deploys the hosting site if `changed` is non-empty. Returns True if a deploy ran."""
+        if not changed:
+            print("Site is up to date; nothing to deploy.")
+            return False
+        subprocess.run(["firebase", "deploy", "--only", "hosting"], cwd=self.public_dir.parent, check=True)
+        return True
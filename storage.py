@@ -1,9 +1,80 @@
 import os
 import json
+import contextlib
+import fcntl
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
 from pathlib import Path
 import firebase_admin
-from firebase_admin import credentials, storage as firebase_storage
+from firebase_admin import credentials, firestore, storage as firebase_storage
+from google.api_core.exceptions import NotFound, PreconditionFailed
 from storage_interface import StorageInterface
+from audio_io import AUDIO_EXTENSIONS
+from upload_queue import UploadJournal, WriteBehindUploader
+from summary_index import SummaryIndex, make_entry
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# A remote lock whose lease has run out is taken to belong to a runner that
+# died. The holder renews the lease every third of this while it works, so a
+# stage may take any time, and a crashed runner's lock is freed within this.
+LOCK_LEASE_SECONDS = 10 * 60
+LOCK_POLL_SECONDS = 5.0
+# Custom metadata key on `summaries/<id>.config.json` blobs holding the
+# config key, so it arrives with the manifest listing instead of a download.
+SUMMARY_CONFIG_METADATA_KEY = "summary-config"
+
+# Local stage locks hash onto this many lock files, so the locks directory
+# stays the same size however many videos are processed.
+LOCK_STRIPES = 256
+
+
+def temp_path_for(path: Path) -> Path:
+    """A sibling of `path` to write to before renaming it into place; unique per process and thread."""
+    return path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def write_text_atomic(path: Path, text: str):
+    """
+    Writes `path` through a temporary file and a rename, so readers (and
+    `*_exists` checks) never see a partly written file.
+    """
+    tmp_path = temp_path_for(path)
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def stage_lock_path(base_dir: Path, video_id: str, stage: str) -> Path:
+    """The lock file for `stage` of `video_id`; unrelated videos may share one."""
+    stripe = int(hashlib.sha1(f"{video_id}.{stage}".encode("utf-8")).hexdigest(), 16) % LOCK_STRIPES
+    return Path(base_dir) / "locks" / f"{stripe:03d}.lock"
+
+
+@contextlib.contextmanager
+def file_lock(path: Path):
+    """
+    An exclusive advisory lock on `path`, shared by every process and thread
+    on this machine. The lock file is left in place; deleting it could let
+    two runners lock different files of the same name.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
 
 class LocalStorage(StorageInterface):
     def __init__(self, base_dir: str = "data"):
@@ -12,6 +83,7 @@ class LocalStorage(StorageInterface):
         self.transcripts_dir = self.base_dir / "transcripts"
         self.summaries_dir = self.base_dir / "summaries"
         self.metadata_dir = self.base_dir / "video-metadata"
+        self.channels_dir = self.base_dir / "channels"
         self._create_dirs()
 
     def _create_dirs(self):
@@ -19,22 +91,38 @@ class LocalStorage(StorageInterface):
         self.transcripts_dir.mkdir(parents=True, exist_ok=True)
         self.summaries_dir.mkdir(parents=True, exist_ok=True)
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        self.channels_dir.mkdir(parents=True, exist_ok=True)
 
     def get_audio_path(self, video_id: str) -> Path:
+        # Audio may be cached as mp3, as the native stream or as decoded PCM
+        # depending on the download mode; new downloads default to mp3.
+        for ext in AUDIO_EXTENSIONS:
+            path = self.audio_dir / f"{video_id}{ext}"
+            if path.exists():
+                return path
         return self.audio_dir / f"{video_id}.mp3"
 
     def get_transcript_path(self, video_id: str) -> Path:
         return self.transcripts_dir / f"{video_id}.txt"
 
+    def get_transcript_segments_path(self, video_id: str) -> Path:
+        return self.transcripts_dir / f"{video_id}.segments.json"
+
     def get_summary_path(self, video_id: str) -> Path:
         return self.summaries_dir / f"{video_id}.md"
 
     def get_summary_html_path(self, video_id: str) -> Path:
         return self.summaries_dir / f"{video_id}.html"
 
+    def get_summary_config_path(self, video_id: str) -> Path:
+        return self.summaries_dir / f"{video_id}.config.json"
+
     def get_metadata_path(self, video_id: str) -> Path:
         return self.metadata_dir / f"{video_id}.json"
 
+    def get_channel_state_path(self, channel_id: str) -> Path:
+        return self.channels_dir / f"{channel_id}.json"
+
     def audio_exists(self, video_id: str) -> bool:
         return self.get_audio_path(video_id).exists()
 
@@ -47,51 +135,243 @@ class LocalStorage(StorageInterface):
     def metadata_exists(self, video_id: str) -> bool:
         return self.get_metadata_path(video_id).exists()
 
+    def channel_state_exists(self, channel_id: str) -> bool:
+        return self.get_channel_state_path(channel_id).exists()
+
     def save_transcript(self, video_id: str, transcript: str):
-        with open(self.get_transcript_path(video_id), "w") as f:
-            f.write(transcript)
+        write_text_atomic(self.get_transcript_path(video_id), transcript)
 
     def load_transcript(self, video_id: str) -> str:
         with open(self.get_transcript_path(video_id), "r") as f:
             return f.read()
 
+    def save_transcript_segments(self, video_id: str, segments: list[dict]):
+        write_text_atomic(self.get_transcript_segments_path(video_id), json.dumps(segments, indent=4))
+
+    def load_transcript_segments(self, video_id: str) -> list[dict]:
+        with open(self.get_transcript_segments_path(video_id), "r") as f:
+            return json.load(f)
+
     def save_metadata(self, video_id: str, metadata: dict):
-        with open(self.get_metadata_path(video_id), "w") as f:
-            json.dump(metadata, f, indent=4)
+        write_text_atomic(self.get_metadata_path(video_id), json.dumps(metadata, indent=4))
 
     def load_metadata(self, video_id: str) -> dict:
         with open(self.get_metadata_path(video_id), "r") as f:
             return json.load(f)
 
     def save_summary(self, video_id: str, summary: str):
-        with open(self.get_summary_path(video_id), "w") as f:
-            f.write(summary)
+        write_text_atomic(self.get_summary_path(video_id), summary)
 
     def load_summary(self, video_id: str) -> str:
         with open(self.get_summary_path(video_id), "r") as f:
             return f.read()
 
     def save_summary_html(self, video_id: str, html_content: str):
-        with open(self.get_summary_html_path(video_id), "w") as f:
-            f.write(html_content)
+        write_text_atomic(self.get_summary_html_path(video_id), html_content)
+
+    def save_summary_config(self, video_id: str, config_key: str):
+        write_text_atomic(self.get_summary_config_path(video_id), json.dumps({"config": config_key}))
+
+    def load_summary_config(self, video_id: str) -> str | None:
+        try:
+            with open(self.get_summary_config_path(video_id), "r") as f:
+                return json.load(f)["config"]
+        except FileNotFoundError:
+            return None
+
+    def save_channel_state(self, channel_id: str, state: dict):
+        write_text_atomic(self.get_channel_state_path(channel_id), json.dumps(state, indent=4))
+
+    def load_channel_state(self, channel_id: str) -> dict:
+        with open(self.get_channel_state_path(channel_id), "r") as f:
+            return json.load(f)
+
+    def lock(self, video_id: str, stage: str):
+        return file_lock(stage_lock_path(self.base_dir, video_id, stage))
 
 class FirebaseStorage(StorageInterface):
-    def __init__(self, local_storage: LocalStorage, cred_path: str, bucket_name: str):
+    def __init__(self, local_storage: LocalStorage, cred_path: str, bucket_name: str, use_manifest: bool = True,
+                 write_behind: bool = False, upload_workers: int = 4, use_index: bool = True):
         self.local_storage = local_storage
+        # With the manifest enabled, remote existence checks are answered from
+        # one blob listing per prefix instead of a blob.exists() call each.
+        self.use_manifest = use_manifest
+        self._manifest: dict[str, set[str]] = {}
+        self._manifest_lock = threading.Lock()
+        # Config keys of summaries, from the custom metadata of the listing.
+        self._summary_configs: dict[str, str] = {}
+        # Per thread: video id -> remote paths uploaded while holding one of
+        # that video's stage locks.
+        self._held = threading.local()
         # TODO: Set up Firebase credentials
         if not firebase_admin._apps:
             cred = credentials.Certificate(cred_path)
             firebase_admin.initialize_app(cred, {'storageBucket': bucket_name})
         self.bucket = firebase_storage.bucket()
+        # In write-behind mode saves return once the local copy is written and
+        # a background pool uploads it; the journal survives crashes.
+        self.uploader = None
+        if write_behind:
+            journal = UploadJournal(self.local_storage.base_dir / "upload-journal")
+            self.uploader = WriteBehindUploader(self.bucket, journal, workers=upload_workers)
+            self.uploader.resume()
+        # The paginated list of summarized videos served by `getSummaries`.
+        self.index = None
+        if use_index:
+            self.index = SummaryIndex(self.bucket, before_publish=self.uploader.flush if self.uploader is not None else None)
 
     def _get_blob(self, path: str):
         return self.bucket.blob(path)
 
-    def _download_if_not_exists(self, video_id: str, remote_path: str, local_path: Path):
-        if not local_path.exists():
+    def _list_prefix(self, prefix: str) -> set[str]:
+        blobs = list(self.bucket.list_blobs(prefix=prefix, fields="items(name,metadata),nextPageToken"))
+        self._summary_configs.update({
+            blob.name: blob.metadata[SUMMARY_CONFIG_METADATA_KEY]
+            for blob in blobs
+            if SUMMARY_CONFIG_METADATA_KEY in (blob.metadata or {})
+        })
+        return {blob.name for blob in blobs}
+
+    def refresh_manifest(self, prefixes: list[str] | None = None):
+        """
+        Re-lists the given prefixes (by default every prefix loaded so far), to
+        pick up objects written by other runs since the manifest was loaded.
+        """
+        with self._manifest_lock:
+            for prefix in prefixes or list(self._manifest):
+                self._manifest[prefix] = self._list_prefix(prefix)
+
+    def _held_locks(self) -> dict[str, set[str]]:
+        if not hasattr(self._held, "locks"):
+            self._held.locks = {}
+        return self._held.locks
+
+    def _remote_exists(self, remote_path: str, fresh: bool = False) -> bool:
+        """
+        Whether `remote_path` is in the bucket. With `fresh`, or without the
+        manifest, the bucket is asked directly and the manifest corrected.
+        """
+        prefix = remote_path.split("/", 1)[0] + "/"
+        if fresh or not self.use_manifest:
+            exists = self._get_blob(remote_path).exists()
+            with self._manifest_lock:
+                if prefix in self._manifest:
+                    (self._manifest[prefix].add if exists else self._manifest[prefix].discard)(remote_path)
+            return exists
+        with self._manifest_lock:
+            if prefix not in self._manifest:
+                self._manifest[prefix] = self._list_prefix(prefix)
+            return remote_path in self._manifest[prefix]
+
+    def _upload(self, remote_path: str, local_path: Path, content_type: str = "text/plain", metadata: dict | None = None):
+        if self.uploader is not None:
+            self.uploader.enqueue(remote_path, local_path, content_type, metadata)
+            for uploads in self._held_locks().values():
+                uploads.add(remote_path)
+        else:
             blob = self._get_blob(remote_path)
-            if blob.exists():
-                blob.download_to_filename(local_path)
+            blob.metadata = metadata
+            blob.upload_from_filename(local_path, content_type=content_type)
+        prefix = remote_path.split("/", 1)[0] + "/"
+        with self._manifest_lock:
+            if prefix in self._manifest:
+                self._manifest[prefix].add(remote_path)
+
+    def is_synced(self, local_path: Path) -> bool:
+        """
+        Whether the local cache file `local_path` is safely in the bucket, with
+        no upload pending, so it can be deleted and downloaded again on demand.
+        """
+        remote_path = Path(local_path).relative_to(self.local_storage.base_dir).as_posix()
+        if self.uploader is not None and self.uploader.journal.get(remote_path) is not None:
+            return False
+        return self._remote_exists(remote_path)
+
+    def _download_if_not_exists(self, video_id: str, remote_path: str, local_path: Path):
+        if not local_path.exists() and self._remote_exists(remote_path, fresh=video_id in self._held_locks()):
+            tmp_path = temp_path_for(local_path)
+            try:
+                self._get_blob(remote_path).download_to_filename(tmp_path)
+                os.replace(tmp_path, local_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+    def _acquire_remote_lock(self, remote_path: str):
+        """
+        Creates the lock blob `remote_path` with `if_generation_match=0`, which
+        succeeds for exactly one runner. Others wait until it is deleted, or
+        delete it themselves once its lease has expired.
+        """
+        blob = self._get_blob(remote_path)
+        waiting = False
+        while True:
+            lease = json.dumps({"expires": time.time() + LOCK_LEASE_SECONDS})
+            try:
+                blob.upload_from_string(lease, content_type="application/json", if_generation_match=0)
+                return blob
+            except PreconditionFailed:
+                pass
+            try:
+                holder = self._get_blob(remote_path)
+                holder.reload()
+                expires = json.loads(holder.download_as_bytes(if_generation_match=holder.generation))["expires"]
+                if expires < time.time():
+                    print(f"Breaking expired lock {remote_path}.")
+                    holder.delete(if_generation_match=holder.generation)
+                    continue
+            except (NotFound, PreconditionFailed):
+                # Released or replaced while we looked; try again at once.
+                continue
+            if not waiting:
+                print(f"Waiting for another runner holding {remote_path}...")
+                waiting = True
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def _renew_remote_lock(self, blob, stop: threading.Event):
+        """Extends the lease of the held lock `blob` until `stop` is set."""
+        while not stop.wait(LOCK_LEASE_SECONDS / 3):
+            lease = json.dumps({"expires": time.time() + LOCK_LEASE_SECONDS})
+            try:
+                blob.upload_from_string(lease, content_type="application/json", if_generation_match=blob.generation)
+            except (NotFound, PreconditionFailed):
+                print(f"Lock {blob.name} was broken by another runner.")
+                return
+            except Exception as e:
+                # Retried at the next renewal, well before the lease runs out.
+                print(f"Failed to renew lock {blob.name}: {e}")
+
+    @contextlib.contextmanager
+    def lock(self, video_id: str, stage: str):
+        """
+        While the lock is held, existence checks for the video go to the
+        bucket rather than the manifest, so they see what the previous holder
+        wrote. With write-behind, the holder's uploads finish before release.
+        """
+        # The local file lock queues runners on this machine, so only one of
+        # them at a time polls the bucket.
+        with self.local_storage.lock(video_id, stage):
+            blob = self._acquire_remote_lock(f"locks/{video_id}.{stage}")
+            stop_renewing = threading.Event()
+            renewer = threading.Thread(target=self._renew_remote_lock, args=(blob, stop_renewing), daemon=True)
+            renewer.start()
+            held = self._held_locks()
+            outermost = video_id not in held
+            uploads = held.setdefault(video_id, set())
+            try:
+                yield
+            finally:
+                try:
+                    if self.uploader is not None and uploads:
+                        self.uploader.flush(remote_paths=uploads)
+                finally:
+                    stop_renewing.set()
+                    renewer.join()
+                if outermost:
+                    del held[video_id]
+                try:
+                    blob.delete(if_generation_match=blob.generation)
+                except (NotFound, PreconditionFailed):
+                    print(f"Lock locks/{video_id}.{stage} expired while held.")
 
     def get_audio_path(self, video_id: str) -> Path:
         return self.local_storage.get_audio_path(video_id)
@@ -99,57 +379,79 @@ class FirebaseStorage(StorageInterface):
     def get_transcript_path(self, video_id: str) -> Path:
         return self.local_storage.get_transcript_path(video_id)
 
+    def get_transcript_segments_path(self, video_id: str) -> Path:
+        return self.local_storage.get_transcript_segments_path(video_id)
+
     def get_summary_path(self, video_id: str) -> Path:
         return self.local_storage.get_summary_path(video_id)
 
     def get_summary_html_path(self, video_id: str) -> Path:
         return self.local_storage.get_summary_html_path(video_id)
 
+    def get_summary_config_path(self, video_id: str) -> Path:
+        return self.local_storage.get_summary_config_path(video_id)
+
     def get_metadata_path(self, video_id: str) -> Path:
         return self.local_storage.get_metadata_path(video_id)
 
+    def get_channel_state_path(self, channel_id: str) -> Path:
+        return self.local_storage.get_channel_state_path(channel_id)
+
     def audio_exists(self, video_id: str) -> bool:
         local_path = self.get_audio_path(video_id)
         if local_path.exists():
             return True
-        blob = self._get_blob(f"audio/{video_id}.mp3")
-        return blob.exists()
+        return self._remote_exists(f"audio/{video_id}.mp3", fresh=video_id in self._held_locks())
 
     def transcript_exists(self, video_id: str) -> bool:
         local_path = self.get_transcript_path(video_id)
         if local_path.exists():
             return True
-        blob = self._get_blob(f"transcripts/{video_id}.txt")
-        return blob.exists()
+        return self._remote_exists(f"transcripts/{video_id}.txt", fresh=video_id in self._held_locks())
 
     def summary_exists(self, video_id: str) -> bool:
         local_path = self.get_summary_path(video_id)
         if local_path.exists():
             return True
-        blob = self._get_blob(f"summaries/{video_id}.md")
-        return blob.exists()
+        return self._remote_exists(f"summaries/{video_id}.md", fresh=video_id in self._held_locks())
 
     def metadata_exists(self, video_id: str) -> bool:
         local_path = self.get_metadata_path(video_id)
         if local_path.exists():
             return True
-        blob = self._get_blob(f"video-metadata/{video_id}.json")
-        return blob.exists()
+        return self._remote_exists(f"video-metadata/{video_id}.json", fresh=video_id in self._held_locks())
+
+    def channel_state_exists(self, channel_id: str) -> bool:
+        local_path = self.get_channel_state_path(channel_id)
+        if local_path.exists():
+            return True
+        return self._remote_exists(f"channels/{channel_id}.json")
 
     def save_transcript(self, video_id: str, transcript: str):
         self.local_storage.save_transcript(video_id, transcript)
-        blob = self._get_blob(f"transcripts/{video_id}.txt")
-        blob.upload_from_string(transcript)
+        self._upload(f"transcripts/{video_id}.txt", self.get_transcript_path(video_id))
 
     def load_transcript(self, video_id: str) -> str:
         local_path = self.get_transcript_path(video_id)
         self._download_if_not_exists(video_id, f"transcripts/{video_id}.txt", local_path)
         return self.local_storage.load_transcript(video_id)
 
+    def save_transcript_segments(self, video_id: str, segments: list[dict]):
+        self.local_storage.save_transcript_segments(video_id, segments)
+        self._upload(f"transcripts/{video_id}.segments.json", self.get_transcript_segments_path(video_id), content_type="application/json")
+
+    def load_transcript_segments(self, video_id: str) -> list[dict]:
+        local_path = self.get_transcript_segments_path(video_id)
+        self._download_if_not_exists(video_id, f"transcripts/{video_id}.segments.json", local_path)
+        return self.local_storage.load_transcript_segments(video_id)
+
     def save_metadata(self, video_id: str, metadata: dict):
         self.local_storage.save_metadata(video_id, metadata)
-        blob = self._get_blob(f"video-metadata/{video_id}.json")
-        blob.upload_from_string(json.dumps(metadata, indent=4))
+        self._upload(f"video-metadata/{video_id}.json", self.get_metadata_path(video_id), content_type="application/json")
+        # Only videos with a published summary are listed; refresh their entry.
+        if self.index is not None and (self.get_summary_html_path(video_id).exists()
+                                       or self._remote_exists(f"summaries/{video_id}.html")):
+            self.index.add(video_id, metadata)
 
     def load_metadata(self, video_id: str) -> dict:
         local_path = self.get_metadata_path(video_id)
@@ -158,8 +460,7 @@ class FirebaseStorage(StorageInterface):
 
     def save_summary(self, video_id: str, summary: str):
         self.local_storage.save_summary(video_id, summary)
-        blob = self._get_blob(f"summaries/{video_id}.md")
-        blob.upload_from_string(summary)
+        self._upload(f"summaries/{video_id}.md", self.get_summary_path(video_id))
 
     def load_summary(self, video_id: str) -> str:
         local_path = self.get_summary_path(video_id)
@@ -168,5 +469,280 @@ class FirebaseStorage(StorageInterface):
 
     def save_summary_html(self, video_id: str, html_content: str):
         self.local_storage.save_summary_html(video_id, html_content)
-        blob = self._get_blob(f"summaries/{video_id}.html")
-        blob.upload_from_string(html_content, content_type='text/html')
+        self._upload(f"summaries/{video_id}.html", self.get_summary_html_path(video_id), content_type="text/html")
+        if self.index is not None and self.metadata_exists(video_id):
+            self.index.add(video_id, self.load_metadata(video_id))
+
+    def save_summary_config(self, video_id: str, config_key: str):
+        self.local_storage.save_summary_config(video_id, config_key)
+        self._upload(f"summaries/{video_id}.config.json", self.get_summary_config_path(video_id),
+                     content_type="application/json", metadata={SUMMARY_CONFIG_METADATA_KEY: config_key})
+
+    def load_summary_config(self, video_id: str) -> str | None:
+        local_path = self.get_summary_config_path(video_id)
+        remote_path = f"summaries/{video_id}.config.json"
+        fresh = video_id in self._held_locks()
+        if not local_path.exists() and not fresh and self.use_manifest and self._remote_exists(remote_path):
+            # Listed with the manifest, so checking a summary costs no download.
+            config_key = self._summary_configs.get(remote_path)
+            if config_key is not None:
+                return config_key
+        self._download_if_not_exists(video_id, remote_path, local_path)
+        return self.local_storage.load_summary_config(video_id)
+
+    def save_channel_state(self, channel_id: str, state: dict):
+        self.local_storage.save_channel_state(channel_id, state)
+        self._upload(f"channels/{channel_id}.json", self.get_channel_state_path(channel_id), content_type="application/json")
+
+    def load_channel_state(self, channel_id: str) -> dict:
+        local_path = self.get_channel_state_path(channel_id)
+        self._download_if_not_exists(channel_id, f"channels/{channel_id}.json", local_path)
+        return self.local_storage.load_channel_state(channel_id)
+
+    def summary_ids(self) -> list[str]:
+        """Ids of every summary in the bucket, including ones not in the local cache."""
+        return sorted(name[len("summaries/"):-len(".md")] for name in self._list_prefix("summaries/") if name.endswith(".md"))
+
+    def rebuild_index(self):
+        """
+        Rebuilds the summary index from every summary in the bucket and the
+        archive flags in Firestore.
+        """
+        entries = {}
+        for name in self._list_prefix("summaries/"):
+            if not name.endswith(".html"):
+                continue
+            video_id = name[len("summaries/"):-len(".html")]
+            if self.metadata_exists(video_id):
+                entries[video_id] = make_entry(video_id, self.load_metadata(video_id))
+        archived_docs = firestore.client().collection("video_properties").where("is_archived", "==", True).stream()
+        self.index.rebuild(entries, {doc.id for doc in archived_docs})
+
+    def flush(self):
+        if self.uploader is not None:
+            print("Waiting for pending uploads to finish...")
+            self.uploader.flush()
+        if self.index is not None:
+            self.index.publish()
+
+_COMPACT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    codec INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+
+# Codecs recorded per row, so a store written with zstd stays readable (and
+# writable with zlib) on a machine without the zstandard package.
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+
+
+class CompactStorage(StorageInterface):
+    """
+    Keeps transcripts, segments, summaries, metadata and channel state as
+    compressed rows of a single SQLite table, so existence checks and loads
+    are indexed lookups and tens of thousands of videos do not mean tens of
+    thousands of small files. Audio and the rendered HTML summaries stay
+    ordinary files, in subdirectories sharded by a hash of the video id.
+
+    Only the audio and HTML paths returned by the `get_*_path` methods exist
+    on disk; the others name a row in the database and are for display only.
+    """
+
+    def __init__(self, base_dir: str = "data", compression_level: int = 9):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.audio_dir = self.base_dir / "audio"
+        self.html_dir = self.base_dir / "html"
+        self.db_path = self.base_dir / "store.sqlite3"
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_COMPACT_SCHEMA)
+
+    @staticmethod
+    def _shard(video_id: str) -> str:
+        # 256 shards keep every directory small even with a very large library.
+        return hashlib.sha1(video_id.encode("utf-8")).hexdigest()[:2]
+
+    def _encode(self, text: str) -> tuple[int, bytes]:
+        data = text.encode("utf-8")
+        if zstd is not None:
+            return _CODEC_ZSTD, zstd.ZstdCompressor(level=self.compression_level).compress(data)
+        return _CODEC_ZLIB, zlib.compress(data, self.compression_level)
+
+    @staticmethod
+    def _decode(codec: int, data: bytes) -> str:
+        if codec == _CODEC_ZSTD:
+            if zstd is None:
+                raise RuntimeError("This store contains zstd-compressed rows; install the zstandard package to read them.")
+            return zstd.ZstdDecompressor().decompress(data).decode("utf-8")
+        return zlib.decompress(data).decode("utf-8")
+
+    def _put(self, kind: str, key: str, text: str):
+        codec, data = self._encode(text)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO artifacts (kind, key, codec, data) VALUES (?, ?, ?, ?)",
+                               (kind, key, codec, data))
+
+    def _get(self, kind: str, key: str) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT codec, data FROM artifacts WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No {kind} stored for {key}")
+        return self._decode(*row)
+
+    def _has(self, kind: str, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM artifacts WHERE kind = ? AND key = ?", (kind, key)).fetchone() is not None
+
+    def _row_path(self, kind: str, key: str) -> Path:
+        return self.db_path / kind / key
+
+    def get_audio_path(self, video_id: str) -> Path:
+        # The shard directory is created by whoever writes the audio.
+        shard_dir = self.audio_dir / self._shard(video_id)
+        for ext in AUDIO_EXTENSIONS:
+            path = shard_dir / f"{video_id}{ext}"
+            if path.exists():
+                return path
+        return shard_dir / f"{video_id}.mp3"
+
+    def get_transcript_path(self, video_id: str) -> Path:
+        return self._row_path("transcript", video_id)
+
+    def get_transcript_segments_path(self, video_id: str) -> Path:
+        return self._row_path("segments", video_id)
+
+    def get_summary_path(self, video_id: str) -> Path:
+        return self._row_path("summary", video_id)
+
+    def get_summary_html_path(self, video_id: str) -> Path:
+        return self.html_dir / self._shard(video_id) / f"{video_id}.html"
+
+    def get_summary_config_path(self, video_id: str) -> Path:
+        return self._row_path("summary_config", video_id)
+
+    def get_metadata_path(self, video_id: str) -> Path:
+        return self._row_path("metadata", video_id)
+
+    def get_channel_state_path(self, channel_id: str) -> Path:
+        return self._row_path("channel", channel_id)
+
+    def audio_exists(self, video_id: str) -> bool:
+        return self.get_audio_path(video_id).exists()
+
+    def transcript_exists(self, video_id: str) -> bool:
+        return self._has("transcript", video_id)
+
+    def summary_exists(self, video_id: str) -> bool:
+        return self._has("summary", video_id)
+
+    def metadata_exists(self, video_id: str) -> bool:
+        return self._has("metadata", video_id)
+
+    def channel_state_exists(self, channel_id: str) -> bool:
+        return self._has("channel", channel_id)
+
+    def save_transcript(self, video_id: str, transcript: str):
+        self._put("transcript", video_id, transcript)
+
+    def load_transcript(self, video_id: str) -> str:
+        return self._get("transcript", video_id)
+
+    def save_transcript_segments(self, video_id: str, segments: list[dict]):
+        self._put("segments", video_id, json.dumps(segments))
+
+    def load_transcript_segments(self, video_id: str) -> list[dict]:
+        return json.loads(self._get("segments", video_id))
+
+    def save_metadata(self, video_id: str, metadata: dict):
+        self._put("metadata", video_id, json.dumps(metadata))
+
+    def load_metadata(self, video_id: str) -> dict:
+        return json.loads(self._get("metadata", video_id))
+
+    def save_summary(self, video_id: str, summary: str):
+        self._put("summary", video_id, summary)
+
+    def load_summary(self, video_id: str) -> str:
+        return self._get("summary", video_id)
+
+    def save_summary_html(self, video_id: str, html_content: str):
+        html_path = self.get_summary_html_path(video_id)
+        html_path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(html_path, html_content)
+
+    def save_summary_config(self, video_id: str, config_key: str):
+        self._put("summary_config", video_id, config_key)
+
+    def load_summary_config(self, video_id: str) -> str | None:
+        try:
+            return self._get("summary_config", video_id)
+        except FileNotFoundError:
+            return None
+
+    def save_channel_state(self, channel_id: str, state: dict):
+        self._put("channel", channel_id, json.dumps(state))
+
+    def load_channel_state(self, channel_id: str) -> dict:
+        return json.loads(self._get("channel", channel_id))
+
+    def lock(self, video_id: str, stage: str):
+        return file_lock(stage_lock_path(self.base_dir, video_id, stage))
+
+    def iter_texts(self, kind: str):
+        """Yields (key, text) for every stored artifact of `kind`, e.g. 'transcript'."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM artifacts WHERE kind = ? ORDER BY key", (kind,)).fetchall()
+        for (key,) in rows:
+            yield key, self._get(kind, key)
+
+    def migrate_from(self, local_storage: LocalStorage) -> dict:
+        """
+        Copies every text artifact of a `LocalStorage` directory tree into the
+        store and moves its audio and HTML files into the sharded layout.
+        The original text files are left in place to be deleted once the
+        migration has been checked. Safe to re-run.
+        """
+        counts = {}
+
+        def copy_texts(kind, directory, suffix, save, parse=lambda text: text):
+            for path in sorted(directory.glob(f"*{suffix}")):
+                video_id = path.name[:-len(suffix)]
+                if kind == "transcript" and video_id.endswith(".segments"):
+                    continue
+                save(video_id, parse(path.read_text()))
+                counts[kind] = counts.get(kind, 0) + 1
+
+        copy_texts("transcript", local_storage.transcripts_dir, ".txt", self.save_transcript)
+        copy_texts("segments", local_storage.transcripts_dir, ".segments.json", self.save_transcript_segments, json.loads)
+        copy_texts("summary", local_storage.summaries_dir, ".md", self.save_summary)
+        copy_texts("summary_config", local_storage.summaries_dir, ".config.json", self.save_summary_config,
+                   lambda text: json.loads(text)["config"])
+        copy_texts("metadata", local_storage.metadata_dir, ".json", self.save_metadata, json.loads)
+        copy_texts("channel", local_storage.channels_dir, ".json", self.save_channel_state, json.loads)
+
+        for path in sorted(local_storage.audio_dir.glob("*")):
+            if path.is_file() and path.suffix in AUDIO_EXTENSIONS and not path.stem.endswith(".part"):
+                audio_path = self.get_audio_path(path.stem).with_suffix(path.suffix)
+                audio_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, audio_path)
+                counts["audio"] = counts.get("audio", 0) + 1
+        for path in sorted(local_storage.summaries_dir.glob("*.html")):
+            html_path = self.get_summary_html_path(path.stem)
+            html_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, html_path)
+            counts["html"] = counts.get("html", 0) + 1
+
+        with self._lock:
+            self._conn.execute("VACUUM")
+        return counts
+
+    def close(self):
+        self._conn.close()
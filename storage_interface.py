@@ -1,3 +1,4 @@
+import contextlib
 from abc import ABC, abstractmethod
 from pathlib import Path
 
@@ -10,6 +11,10 @@ class StorageInterface(ABC):
     def get_transcript_path(self, video_id: str) -> Path:
         pass
 
+    @abstractmethod
+    def get_transcript_segments_path(self, video_id: str) -> Path:
+        pass
+
     @abstractmethod
     def get_summary_path(self, video_id: str) -> Path:
         pass
@@ -18,10 +23,18 @@ class StorageInterface(ABC):
     def get_summary_html_path(self, video_id: str) -> Path:
         pass
 
+    @abstractmethod
+    def get_summary_config_path(self, video_id: str) -> Path:
+        pass
+
     @abstractmethod
     def get_metadata_path(self, video_id: str) -> Path:
         pass
 
+    @abstractmethod
+    def get_channel_state_path(self, channel_id: str) -> Path:
+        pass
+
     @abstractmethod
     def audio_exists(self, video_id: str) -> bool:
         pass
@@ -38,6 +51,10 @@ class StorageInterface(ABC):
     def metadata_exists(self, video_id: str) -> bool:
         pass
 
+    @abstractmethod
+    def channel_state_exists(self, channel_id: str) -> bool:
+        pass
+
     @abstractmethod
     def save_transcript(self, video_id: str, transcript: str):
         pass
@@ -46,6 +63,14 @@ class StorageInterface(ABC):
     def load_transcript(self, video_id: str) -> str:
         pass
 
+    @abstractmethod
+    def save_transcript_segments(self, video_id: str, segments: list[dict]):
+        pass
+
+    @abstractmethod
+    def load_transcript_segments(self, video_id: str) -> list[dict]:
+        pass
+
     @abstractmethod
     def save_metadata(self, video_id: str, metadata: dict):
         pass
@@ -65,3 +90,136 @@ class StorageInterface(ABC):
     @abstractmethod
     def save_summary_html(self, video_id: str, html_content: str):
         pass
+
+    @abstractmethod
+    def save_summary_config(self, video_id: str, config_key: str):
+        pass
+
+    @abstractmethod
+    def load_summary_config(self, video_id: str) -> str | None:
+        """The config key recorded with the video's summary, or None if there is none."""
+        pass
+
+    @abstractmethod
+    def save_channel_state(self, channel_id: str, state: dict):
+        pass
+
+    @abstractmethod
+    def load_channel_state(self, channel_id: str) -> dict:
+        pass
+
+    def flush(self):
+        """Blocks until any writes buffered by the storage have been persisted."""
+        pass
+
+    def lock(self, video_id: str, stage: str):
+        """
+        Context manager held while one runner does `stage` (e.g. 'download')
+        for a video, so concurrent runners do the work once. Callers check
+        again for the stage's output once the lock is held.
+        """
+        return contextlib.nullcontext()
+
+
+class StorageWrapper(StorageInterface):
+    """
+    A storage that forwards every call to the wrapped `storage`. Each
+    interface method goes through `_call`, so a subclass can add behaviour
+    to all of them (timing, cache tracking) by overriding that one method,
+    or to a single one by overriding it directly. Attributes not on the
+    interface (such as `FirebaseStorage.refresh_manifest`) are passed
+    through untouched.
+    """
+
+    def __init__(self, storage: StorageInterface):
+        self.storage = storage
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def _call(self, name: str, *args, **kwargs):
+        return getattr(self.storage, name)(*args, **kwargs)
+
+    def get_audio_path(self, video_id: str) -> Path:
+        return self._call("get_audio_path", video_id)
+
+    def get_transcript_path(self, video_id: str) -> Path:
+        return self._call("get_transcript_path", video_id)
+
+    def get_transcript_segments_path(self, video_id: str) -> Path:
+        return self._call("get_transcript_segments_path", video_id)
+
+    def get_summary_path(self, video_id: str) -> Path:
+        return self._call("get_summary_path", video_id)
+
+    def get_summary_html_path(self, video_id: str) -> Path:
+        return self._call("get_summary_html_path", video_id)
+
+    def get_summary_config_path(self, video_id: str) -> Path:
+        return self._call("get_summary_config_path", video_id)
+
+    def get_metadata_path(self, video_id: str) -> Path:
+        return self._call("get_metadata_path", video_id)
+
+    def get_channel_state_path(self, channel_id: str) -> Path:
+        return self._call("get_channel_state_path", channel_id)
+
+    def audio_exists(self, video_id: str) -> bool:
+        return self._call("audio_exists", video_id)
+
+    def transcript_exists(self, video_id: str) -> bool:
+        return self._call("transcript_exists", video_id)
+
+    def summary_exists(self, video_id: str) -> bool:
+        return self._call("summary_exists", video_id)
+
+    def metadata_exists(self, video_id: str) -> bool:
+        return self._call("metadata_exists", video_id)
+
+    def channel_state_exists(self, channel_id: str) -> bool:
+        return self._call("channel_state_exists", channel_id)
+
+    def save_transcript(self, video_id: str, transcript: str):
+        return self._call("save_transcript", video_id, transcript)
+
+    def load_transcript(self, video_id: str) -> str:
+        return self._call("load_transcript", video_id)
+
+    def save_transcript_segments(self, video_id: str, segments: list[dict]):
+        return self._call("save_transcript_segments", video_id, segments)
+
+    def load_transcript_segments(self, video_id: str) -> list[dict]:
+        return self._call("load_transcript_segments", video_id)
+
+    def save_metadata(self, video_id: str, metadata: dict):
+        return self._call("save_metadata", video_id, metadata)
+
+    def load_metadata(self, video_id: str) -> dict:
+        return self._call("load_metadata", video_id)
+
+    def save_summary(self, video_id: str, summary: str):
+        return self._call("save_summary", video_id, summary)
+
+    def load_summary(self, video_id: str) -> str:
+        return self._call("load_summary", video_id)
+
+    def save_summary_html(self, video_id: str, html_content: str):
+        return self._call("save_summary_html", video_id, html_content)
+
+    def save_summary_config(self, video_id: str, config_key: str):
+        return self._call("save_summary_config", video_id, config_key)
+
+    def load_summary_config(self, video_id: str) -> str | None:
+        return self._call("load_summary_config", video_id)
+
+    def save_channel_state(self, channel_id: str, state: dict):
+        return self._call("save_channel_state", channel_id, state)
+
+    def load_channel_state(self, channel_id: str) -> dict:
+        return self._call("load_channel_state", channel_id)
+
+    def flush(self):
+        return self._call("flush")
+
+    def lock(self, video_id: str, stage: str):
+        return self._call("lock", video_id, stage)
@@ -0,0 +1,159 @@
+import json
+import shutil
+import subprocess
+import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import yt_dlp
+from audio_io import SAMPLE_RATE
+from html_generator import generate_summary_html
+from storage import write_text_atomic
+
+# Bytes per second of 16-bit mono PCM at Whisper's sample rate.
+_BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+
+class StreamingSummarizer:
+    """
+    Transcribes a video or live stream while it is still being pulled from
+    YouTube, and keeps a rolling summary up to date.
+
+    ffmpeg decodes the stream into 16 kHz mono PCM on a pipe. The PCM is
+    transcribed one window at a time. Every `summary_interval` seconds of
+    audio the summary is regenerated from the transcript so far, on a
+    background thread so the pipe keeps being read, and the first useful
+    output appears minutes after starting instead of after the whole video.
+
+    Until the stream ends, the transcript and rolling summary are written to
+    `partial_dir/<video_id>/` rather than to storage. Only the final pass
+    saves them as the video's transcript and summary, so a stream that dies
+    part way leaves nothing that looks complete to `process_video`.
+    """
+
+    def __init__(self, summarizer, window_seconds: float = 30.0, summary_interval: float = 300.0,
+                 partial_dir: str = "data/streams"):
+        self.summarizer = summarizer
+        self.window_seconds = window_seconds
+        self.summary_interval = summary_interval
+        self.partial_dir = Path(partial_dir)
+
+    def _open_stream(self, youtube_url: str, video_id: str) -> subprocess.Popen:
+        with yt_dlp.YoutubeDL({'format': 'bestaudio/best', 'quiet': True}) as ydl:
+            info_dict = ydl.extract_info(youtube_url, download=False)
+        storage = self.summarizer.storage
+        if not storage.metadata_exists(video_id):
+            storage.save_metadata(video_id, {
+                'title': info_dict.get('title'),
+                'uploader': info_dict.get('uploader'),
+                'upload_date': info_dict.get('upload_date'),
+                'description': info_dict.get('description'),
+                'duration': info_dict.get('duration'),
+            })
+        command = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+        if info_dict.get('http_headers'):
+            command += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in info_dict['http_headers'].items())]
+        command += ["-i", info_dict['url'], "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1"]
+        return subprocess.Popen(command, stdout=subprocess.PIPE)
+
+    def _transcribe_pcm(self, pcm: bytes, tmp_dir: str) -> dict:
+        # Written as a 16 kHz mono WAV so every backend can read it, and local
+        # Whisper loads the samples without running ffmpeg again.
+        window_path = Path(tmp_dir) / "window.wav"
+        with wave.open(str(window_path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(SAMPLE_RATE)
+            wav_file.writeframes(pcm)
+        return self.summarizer.transcribe_file(window_path)
+
+    def iter_segments(self, process: subprocess.Popen):
+        """
+        Yields, for each window as the audio arrives, the list of its
+        transcript segments with absolute timestamps. Unless the stream has
+        ended, the last segment of each window may be cut off mid-sentence.
+        Its audio is carried over into the next window and transcribed again
+        there.
+        """
+        window_bytes = int(self.window_seconds * _BYTES_PER_SECOND)
+        buffer = b""
+        offset = 0.0
+        with tempfile.TemporaryDirectory(prefix="stream-") as tmp_dir:
+            while True:
+                chunk = process.stdout.read(window_bytes)
+                final = len(chunk) < window_bytes
+                buffer += chunk
+                if buffer:
+                    segments = self._transcribe_pcm(buffer, tmp_dir)["segments"]
+                    buffer_seconds = len(buffer) / _BYTES_PER_SECOND
+                    if not final and len(segments) > 1:
+                        keep, carry_from = segments[:-1], segments[-1]["start"]
+                    else:
+                        keep, carry_from = segments, buffer_seconds
+                    yield [
+                        {
+                            "start": round(segment["start"] + offset, 3),
+                            "end": round(segment["end"] + offset, 3),
+                            "text": segment["text"].strip(),
+                        }
+                        for segment in keep
+                    ]
+                    carry_bytes = int(carry_from * SAMPLE_RATE) * 2
+                    buffer = buffer[carry_bytes:]
+                    offset += carry_bytes / _BYTES_PER_SECOND
+                if final:
+                    return
+
+    def _rolling_summary(self, video_id: str, transcript: str, prompt: str, partial_dir: Path):
+        storage = self.summarizer.storage
+        summary = self.summarizer.generate_summary(video_id, transcript, prompt)
+        metadata = storage.load_metadata(video_id) if storage.metadata_exists(video_id) else {}
+        write_text_atomic(partial_dir / "summary.md", summary)
+        write_text_atomic(partial_dir / "summary.html", generate_summary_html(video_id, summary, metadata))
+        print(f"Rolling summary written to {partial_dir / 'summary.html'}")
+
+    def run(self, youtube_url: str, prompt: str) -> Path:
+        summarizer = self.summarizer
+        storage = summarizer.storage
+        video_id = summarizer.get_video_id(youtube_url)
+        partial_dir = self.partial_dir / video_id
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        process = self._open_stream(youtube_url, video_id)
+
+        segments = []
+        last_summary_at = 0.0
+        # One rolling summary at a time runs beside the read loop; a window
+        # that comes due while one is still running waits for the next window.
+        summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rolling-summary")
+        pending_summary = None
+        try:
+            for window in self.iter_segments(process):
+                if not window:
+                    continue
+                segments.extend(window)
+                transcript = " ".join(s["text"] for s in segments)
+                write_text_atomic(partial_dir / "transcript.txt", transcript)
+                write_text_atomic(partial_dir / "segments.json", json.dumps(segments))
+                for segment in window:
+                    print(f"[{segment['end']:.0f}s] {segment['text']}")
+                end = window[-1]["end"]
+                if end - last_summary_at >= self.summary_interval and (pending_summary is None or pending_summary.done()):
+                    if pending_summary is not None and pending_summary.exception() is not None:
+                        print(f"Rolling summary failed: {pending_summary.exception()}")
+                    print(f"Updating rolling summary for video {video_id} at {end:.0f}s of audio...")
+                    pending_summary = summary_executor.submit(self._rolling_summary, video_id, transcript, prompt, partial_dir)
+                    last_summary_at = end
+        finally:
+            process.stdout.close()
+            process.wait()
+            summary_executor.shutdown(wait=True)
+
+        if process.returncode not in (0, None):
+            raise RuntimeError(f"ffmpeg exited with status {process.returncode} while streaming {video_id}")
+        if segments:
+            transcript = " ".join(s["text"] for s in segments)
+            storage.save_transcript(video_id, transcript)
+            storage.save_transcript_segments(video_id, segments)
+            summarizer.summarize_transcript(video_id, transcript, prompt)
+        shutil.rmtree(partial_dir, ignore_errors=True)
+        return storage.get_summary_html_path(video_id)
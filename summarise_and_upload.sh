@@ -1,5 +1,5 @@
+set -e
 video_key="$1"
 echo $video_key
-python main.py https://www.youtube.com/watch?v=$video_key
-cp data/summaries/$video_key.html firebase/public/
-cd firebase && firebase deploy && cd ..
\ No newline at end of file
+python main.py --youtube_url "https://www.youtube.com/watch?v=$video_key"
+python main.py --build-site "$video_key" --deploy
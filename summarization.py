@@ -0,0 +1,42 @@
+import re
+
+MAP_PROMPT = (
+    "The following is part {index} of {total} of a longer transcript. "
+    "Summarize this part in detail, keeping the key facts, names, numbers and arguments. "
+    "Write in the original language of the transcript."
+)
+
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of a single transcript, in order. "
+    "Treat them together as the transcript and follow these instructions:\n\n{prompt}"
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def split_transcript(transcript: str, max_chars: int) -> list[str]:
+    """
+    Splits a transcript into chunks of at most `max_chars` characters,
+    breaking between paragraphs or sentences where possible. A single
+    sentence longer than `max_chars` is hard-split.
+    """
+    pieces = []
+    for paragraph in transcript.split("\n"):
+        pieces.extend(piece for piece in _SENTENCE_END.split(paragraph) if piece)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        while len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(piece[:max_chars])
+            piece = piece[max_chars:]
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
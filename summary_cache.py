@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Content-addressed store of generated summaries, keyed by everything that
+    determines Gemini's output: the transcript, the prompt, the model and the
+    generation config. Entries are evicted least-recently-used first once the
+    cache grows beyond `max_bytes`, down to `low_water` of it so the scan
+    of the cache directory is not repeated on every following write.
+
+    Which configuration produced each video's current summary is recorded in
+    storage next to the summary; `video_config` still reads the records
+    earlier versions kept in the cache's `videos` directory.
+    """
+
+    def __init__(self, cache_dir: str = "data/summary-cache", max_bytes: int = 512 * 1024 * 1024, low_water: float = 0.9):
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.videos_dir = self.cache_dir / "videos"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._total_bytes = sum(path.stat().st_size for path in self.entries_dir.glob("*/*.md"))
+
+    @staticmethod
+    def config_key(prompt: str, model_name: str, generation_config: dict) -> str:
+        return _sha256(json.dumps({
+            "prompt": _sha256(prompt),
+            "model": model_name,
+            "generation_config": generation_config,
+        }, sort_keys=True))
+
+    @staticmethod
+    def make_key(transcript: str, prompt: str, model_name: str, generation_config: dict) -> str:
+        return _sha256(_sha256(transcript) + SummaryCache.config_key(prompt, model_name, generation_config))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / key[:2] / f"{key}.md"
+
+    def get(self, key: str) -> str | None:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r") as f:
+                summary = f.read()
+        except FileNotFoundError:
+            return None
+        # The modification time doubles as the LRU timestamp.
+        os.utime(path)
+        return summary
+
+    def put(self, key: str, summary: str):
+        path = self._entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Unique per process and thread, since runners may share the cache.
+        tmp_path = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(summary)
+        with self._lock:
+            if path.exists():
+                self._total_bytes -= path.stat().st_size
+            os.replace(tmp_path, path)
+            self._total_bytes += path.stat().st_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self.entries_dir.glob("*/*.md"):
+            try:
+                entries.append((path.stat(), path))
+            except FileNotFoundError:
+                # Evicted by another runner sharing the cache.
+                continue
+        entries.sort(key=lambda entry: entry[0].st_mtime)
+        # The directory total also counts other runners' writes.
+        self._total_bytes = sum(stat.st_size for stat, _ in entries)
+        target = self.max_bytes * self.low_water
+        for stat, path in entries:
+            if self._total_bytes <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._total_bytes -= stat.st_size
+
+    def video_config(self, video_id: str) -> str | None:
+        try:
+            with open(self.videos_dir / f"{video_id}.json", "r") as f:
+                return json.load(f)["config"]
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+# Bucket prefix of the index. `entries.json` holds every indexed video and the
+# archived ids; `page-<n>.json` are the pages served by the `getSummaries`
+# function. `firebase/functions/index.js` reads and writes the same layout.
+INDEX_PREFIX = "summary-index/"
+ENTRIES_BLOB = INDEX_PREFIX + "entries.json"
+PAGE_SIZE = 50
+# Browsers and the CDN may serve a page for this long before asking again.
+PAGE_CACHE_CONTROL = "public, max-age=60, s-maxage=300"
+# Custom metadata key on each page holding the generation of `entries.json`
+# the page was built from. A writer never replaces a page built from a newer
+# generation than its own.
+PAGE_GENERATION_KEY = "entries-generation"
+
+# Metadata fields copied into the index; everything the list page shows.
+ENTRY_FIELDS = ("title", "uploader", "upload_date", "duration")
+
+
+def make_entry(video_id: str, metadata: dict) -> dict:
+    entry = {field: metadata.get(field) for field in ENTRY_FIELDS}
+    entry["id"] = video_id
+    return entry
+
+
+def page_generation(blob) -> int:
+    return int((blob.metadata or {}).get(PAGE_GENERATION_KEY, 0))
+
+
+def build_pages(state: dict, page_size: int = PAGE_SIZE) -> list[dict]:
+    """
+    Splits the visible entries of `state` into pages, newest upload first.
+    Always returns at least one (possibly empty) page.
+    """
+    archived = set(state.get("archived", []))
+    videos = [entry for video_id, entry in state.get("entries", {}).items() if video_id not in archived]
+    videos.sort(key=lambda entry: (entry.get("upload_date") or "", entry["id"]), reverse=True)
+    total_pages = max(1, -(-len(videos) // page_size))
+    return [
+        {
+            "page": number + 1,
+            "pages": total_pages,
+            "total": len(videos),
+            "videos": videos[number * page_size:(number + 1) * page_size],
+        }
+        for number in range(total_pages)
+    ]
+
+
+class SummaryIndex:
+    """
+    Maintains the precomputed, paginated list of summarized videos in the
+    bucket, so the site's index page reads one small object instead of
+    scanning every metadata file on each request.
+
+    Entries added during a run are batched and published with a
+    read-modify-write of `entries.json` guarded by its generation number, so
+    concurrent writers (other runs, or the `modifyVideo` function archiving a
+    video) never lose each other's changes. Only pages whose content changed
+    are re-uploaded, and each page records the entries generation it was
+    built from, so a writer holding an older snapshot leaves it alone.
+    """
+
+    def __init__(self, bucket, page_size: int = PAGE_SIZE, publish_interval: float = 60.0, max_attempts: int = 10,
+                 before_publish=None):
+        self.bucket = bucket
+        # Called before each publish, e.g. to wait for write-behind uploads so
+        # the index never lists a video whose summary is not in the bucket yet.
+        self.before_publish = before_publish
+        self.page_size = page_size
+        self.publish_interval = publish_interval
+        self.max_attempts = max_attempts
+        self._pending: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._last_published = time.monotonic()
+
+    def add(self, video_id: str, metadata: dict):
+        """Queues `video_id` to be listed (or its entry refreshed) on the next publish."""
+        with self._lock:
+            self._pending[video_id] = make_entry(video_id, metadata)
+            due = time.monotonic() - self._last_published >= self.publish_interval
+        if due:
+            try:
+                self.publish()
+            except Exception as e:
+                # The entries stay queued for the next publish.
+                print(f"Failed to publish summary index: {e}")
+
+    def _load_state(self) -> tuple[dict, int]:
+        blob = self.bucket.blob(ENTRIES_BLOB)
+        try:
+            blob.reload()
+            state = json.loads(blob.download_as_bytes(if_generation_match=blob.generation))
+            return state, blob.generation
+        except NotFound:
+            return {"entries": {}, "archived": []}, 0
+
+    def _update_state(self, update) -> tuple[dict, int]:
+        """Applies `update` to the bucket's entries and returns the new state and its generation."""
+        for _ in range(self.max_attempts):
+            state, generation = self._load_state()
+            update(state)
+            blob = self.bucket.blob(ENTRIES_BLOB)
+            try:
+                blob.upload_from_string(json.dumps(state), content_type="application/json", if_generation_match=generation)
+                return state, blob.generation
+            except (PreconditionFailed, NotFound):
+                # Someone else wrote the index since it was read; merge again.
+                continue
+        raise RuntimeError(f"Could not update {ENTRIES_BLOB} after {self.max_attempts} attempts")
+
+    def _write_pages(self, state: dict, generation: int):
+        for _ in range(self.max_attempts):
+            try:
+                self._write_pages_once(state, generation)
+                return
+            except (PreconditionFailed, NotFound):
+                # Another writer changed a page since the listing; list again.
+                continue
+        raise RuntimeError(f"Could not write the {INDEX_PREFIX} pages after {self.max_attempts} attempts")
+
+    def _write_pages_once(self, state: dict, generation: int):
+        existing = {
+            blob.name: blob
+            for blob in self.bucket.list_blobs(
+                prefix=INDEX_PREFIX + "page-",
+                fields="items(name,md5Hash,generation,metageneration,metadata),nextPageToken",
+            )
+        }
+        pages = build_pages(state, self.page_size)
+        for page in pages:
+            name = f"{INDEX_PREFIX}page-{page['page']}.json"
+            body = json.dumps(page).encode("utf-8")
+            current = existing.pop(name, None)
+            if current is not None and page_generation(current) >= generation:
+                continue
+            if current is not None and current.md5_hash == base64.b64encode(hashlib.md5(body).digest()).decode("ascii"):
+                # Unchanged content; only record that it is current as of this generation.
+                current.metadata = {PAGE_GENERATION_KEY: str(generation)}
+                current.patch(if_metageneration_match=current.metageneration)
+                continue
+            blob = self.bucket.blob(name)
+            blob.cache_control = PAGE_CACHE_CONTROL
+            blob.metadata = {PAGE_GENERATION_KEY: str(generation)}
+            blob.upload_from_string(body, content_type="application/json",
+                                    if_generation_match=current.generation if current is not None else 0)
+        # Pages past the end left over from a longer list.
+        for blob in existing.values():
+            if page_generation(blob) < generation:
+                blob.delete(if_generation_match=blob.generation)
+
+    def publish(self):
+        """Merges the queued entries into the bucket index and rewrites changed pages."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_published = time.monotonic()
+        if not pending:
+            return
+        try:
+            if self.before_publish is not None:
+                self.before_publish()
+            state, generation = self._update_state(lambda state: state.setdefault("entries", {}).update(pending))
+            self._write_pages(state, generation)
+        except Exception:
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+            raise
+        print(f"Published summary index with {len(pending)} updated videos.")
+
+    def rebuild(self, entries: dict[str, dict], archived: set[str]):
+        """Replaces the whole index, e.g. to backfill a library indexed before this existed."""
+        def replace(state):
+            state["entries"] = entries
+            state["archived"] = sorted(archived)
+        self._write_pages(*self._update_state(replace))
+        print(f"Rebuilt summary index with {len(entries)} videos ({len(archived)} archived).")
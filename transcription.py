@@ -0,0 +1,154 @@
+import os
+import multiprocessing
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from audio_io import load_audio
+
+# Local engines selectable with `local_backend` / --transcription-backend.
+LOCAL_BACKENDS = ("whisper", "faster-whisper")
+
+
+class TranscriptionBackend(ABC):
+    """
+    A speech-to-text engine. `transcribe` returns the normalised
+    {"text": ..., "segments": [{start, end, text}]} dict of `result_to_dict`
+    and may be called from several threads at once.
+    """
+
+    name: str
+
+    @abstractmethod
+    def transcribe(self, audio_path: Path) -> dict:
+        pass
+
+    def close(self):
+        pass
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper on PyTorch, in float32 on the CPU."""
+
+    name = "whisper"
+
+    def __init__(self, model_name: str = "base", threads: int | None = None):
+        import torch
+        import whisper
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(model_name)
+        # Whisper installs kv-cache hooks on the model while decoding, so one
+        # model must not be used by two threads at once.
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_path: Path) -> dict:
+        with self._lock:
+            return result_to_dict(self.model.transcribe(load_audio(audio_path)))
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    faster-whisper: the same Whisper models run by CTranslate2, int8-quantized
+    on the CPU by default. With `vad_filter`, Silero voice activity detection
+    drops silence and music before decoding, so only speech is transcribed.
+    Needs the optional faster-whisper package.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str = "base", compute_type: str = "int8", vad_filter: bool = True,
+                 threads: int | None = None, beam_size: int = 5):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError("The faster-whisper backend needs `pip install faster-whisper`.") from e
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=threads or 0)
+        self.vad_filter = vad_filter
+        self.beam_size = beam_size
+
+    def transcribe(self, audio_path: Path) -> dict:
+        segments, _ = self.model.transcribe(load_audio(audio_path), beam_size=self.beam_size, vad_filter=self.vad_filter)
+        # `segments` is a generator; decoding happens while it is consumed.
+        segments = list(segments)
+        return result_to_dict({"text": "".join(segment.text for segment in segments), "segments": segments})
+
+
+def create_backend(name: str, model_name: str = "base", threads: int | None = None) -> TranscriptionBackend:
+    if name == "whisper":
+        return WhisperBackend(model_name, threads=threads)
+    if name == "faster-whisper":
+        return FasterWhisperBackend(model_name, threads=threads)
+    raise ValueError(f"Invalid transcription backend: {name}")
+
+
+# The backend owned by the current worker process, created once by
+# `_init_worker` and reused for every file the worker is handed.
+_worker_backend = None
+
+
+def _init_worker(backend_name: str, model_name: str, threads_per_worker: int):
+    global _worker_backend
+    # Without the thread cap every worker spawns one intra-op thread per core
+    # and the pool ends up fighting over the CPU instead of scaling with it.
+    _worker_backend = create_backend(backend_name, model_name, threads=threads_per_worker)
+
+
+def result_to_dict(result) -> dict:
+    """
+    Normalises a local Whisper result dict or an OpenAI verbose_json
+    transcription object into {"text": ..., "segments": [{start, end, text}]}.
+    """
+    if isinstance(result, dict):
+        text = result["text"]
+        segments = result.get("segments") or []
+    else:
+        text = result.text
+        segments = getattr(result, "segments", None) or []
+    return {
+        "text": text,
+        "segments": [
+            {
+                "start": float(segment["start"] if isinstance(segment, dict) else segment.start),
+                "end": float(segment["end"] if isinstance(segment, dict) else segment.end),
+                "text": segment["text"] if isinstance(segment, dict) else segment.text,
+            }
+            for segment in segments
+        ],
+    }
+
+
+def _transcribe_in_worker(audio_path: str) -> dict:
+    return _worker_backend.transcribe(Path(audio_path))
+
+
+class WhisperProcessPool:
+    """
+    Local transcription spread over a pool of worker processes. Each worker
+    creates its backend (loading the model) once in its initializer and then
+    takes audio paths off the pool's shared call queue.
+    """
+
+    def __init__(self, model_name: str = "base", workers: int | None = None, backend: str = "whisper"):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        # Spawn rather than fork: the parent may already be running pipeline
+        # threads and have torch initialised, neither of which survive a fork.
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(backend, model_name, threads_per_worker),
+        )
+
+    def submit(self, audio_path: Path) -> Future:
+        return self.executor.submit(_transcribe_in_worker, str(audio_path))
+
+    def transcribe(self, audio_path: Path) -> dict:
+        return self.submit(audio_path).result()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class UploadJournal:
+    """
+    Durable record of uploads that have been accepted but not yet confirmed
+    by the bucket. Each pending upload is one small JSON file, written via a
+    temp file and rename so a crash never leaves a half-written entry. A new
+    write to the same remote path replaces the previous entry.
+    """
+
+    def __init__(self, journal_dir: Path):
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, remote_path: str) -> Path:
+        return self.journal_dir / f"{hashlib.sha1(remote_path.encode()).hexdigest()}.json"
+
+    def add(self, remote_path: str, local_path: Path, content_type: str, metadata: dict | None = None) -> int:
+        version = time.time_ns()
+        entry = {
+            "remote_path": remote_path,
+            "local_path": str(local_path),
+            "content_type": content_type,
+            "metadata": metadata,
+            "version": version,
+        }
+        entry_path = self._entry_path(remote_path)
+        # Several processes can share the journal, so the temp name is unique
+        # per process and thread.
+        tmp_path = entry_path.with_name(f".{entry_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, entry_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return version
+
+    def get(self, remote_path: str) -> dict | None:
+        try:
+            with open(self._entry_path(remote_path), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def remove(self, remote_path: str):
+        self._entry_path(remote_path).unlink(missing_ok=True)
+
+    def pending(self) -> list[dict]:
+        entries = []
+        for entry_path in sorted(self.journal_dir.glob("*.json")):
+            try:
+                with open(entry_path, "r") as f:
+                    entries.append(json.load(f))
+            except FileNotFoundError:
+                # Uploaded and removed by another process since the listing.
+                continue
+        return entries
+
+
+class WriteBehindUploader:
+    """
+    Drains an `UploadJournal` into a bucket on a background thread pool.
+
+    Uploads read the local file at upload time, so several writes to the same
+    path before it is drained collapse into one upload of the latest content.
+    All workers share the bucket's client and therefore its HTTP connections.
+    """
+
+    def __init__(self, bucket, journal: UploadJournal, workers: int = 4, max_retries: int = 5, base_delay: float = 1.0):
+        self.bucket = bucket
+        self.journal = journal
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload")
+        self._queued: set[str] = set()
+        self._condition = threading.Condition()
+
+    def enqueue(self, remote_path: str, local_path: Path, content_type: str, metadata: dict | None = None):
+        with self._condition:
+            self.journal.add(remote_path, local_path, content_type, metadata)
+            if remote_path in self._queued:
+                # The running or pending upload will pick up the new version.
+                return
+            self._queued.add(remote_path)
+        self.executor.submit(self._drain, remote_path)
+
+    def resume(self):
+        """Re-queues uploads left in the journal by a previous run."""
+        pending = self.journal.pending()
+        if pending:
+            print(f"Resuming {len(pending)} pending uploads...")
+        for entry in pending:
+            with self._condition:
+                if entry["remote_path"] in self._queued:
+                    continue
+                self._queued.add(entry["remote_path"])
+            self.executor.submit(self._drain, entry["remote_path"])
+
+    def _upload_with_retries(self, entry: dict) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                blob = self.bucket.blob(entry["remote_path"])
+                # Entries journaled before custom metadata was supported have none.
+                blob.metadata = entry.get("metadata")
+                blob.upload_from_filename(entry["local_path"], content_type=entry["content_type"])
+                return True
+            except FileNotFoundError:
+                print(f"Local file for {entry['remote_path']} is gone, dropping upload.")
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Giving up on upload of {entry['remote_path']} for this run: {e}")
+                    return False
+                delay = self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"Upload of {entry['remote_path']} failed ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _drain(self, remote_path: str):
+        while True:
+            entry = self.journal.get(remote_path)
+            uploaded = entry is not None and self._upload_with_retries(entry)
+            with self._condition:
+                current = self.journal.get(remote_path)
+                if uploaded and current is not None and current["version"] != entry["version"]:
+                    # Written again while uploading: go round for the new version.
+                    continue
+                if uploaded:
+                    self.journal.remove(remote_path)
+                # A failed upload keeps its journal entry so the next run retries it.
+                self._queued.discard(remote_path)
+                self._condition.notify_all()
+                return
+
+    def flush(self, timeout: float | None = None, remote_paths: set[str] | None = None) -> bool:
+        """
+        Blocks until every queued upload, or every queued upload of
+        `remote_paths`, has finished. Returns False on timeout.
+        """
+        with self._condition:
+            if remote_paths is None:
+                return self._condition.wait_for(lambda: not self._queued, timeout=timeout)
+            return self._condition.wait_for(lambda: not self._queued & remote_paths, timeout=timeout)
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown(wait=True)